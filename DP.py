@@ -5,7 +5,6 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
 import pyqtgraph as pg
 import numpy as np
-from matplotlib import cm
 from functools import partial
 
 # Display panel import requirements (autorship)
@@ -14,6 +13,15 @@ from pyqt_items.pyqt_ZoomItem import ZoomItem
 from pyqt_items.pyqt_PlotWidgetKP import PlotWidgetKP
 from pyqt_items.pyqt_ResizeItem import ResizeItem
 from pyqt_items.pyqt_CircularListWidget import CircularListWidget
+from pyqt_items.pyqt_ScheduleItem import ScheduleItem
+from pyqt_items.pyqt_WorkerItem import WorkerItem, WorkerSignals
+from pyqt_items.pyqt_ProfilerItem import ProfilerItem
+from numpy_items.numpy_AxisIndexItem import AxisIndexItem
+from numpy_items.numpy_CacheItem import CacheItem
+from numpy_items.numpy_PyramidItem import PyramidItem
+from numpy_items.numpy_ColormapItem import ColormapItem
+from numpy_items.numpy_StatsItem import StatsItem
+from numpy_items.numpy_PrefixSumItem import PrefixSumItem
 
 ################################################################################
 
@@ -69,7 +77,9 @@ class GUI_DisplayPanel(object):
         pg.setConfigOptions(background='k')
 
         # Define default Colormap
-        self.colormap=self.get_mpl_colormap('Greys')
+        # (See numpy_ColormapItem.py, the lookup tables of the Cmaps menu are precomputed)
+        self.Colormaps=ColormapItem()
+        self.colormap=self.Colormaps.get('Greys')
 
         # Initial padding in percentage of total range
         self.pd=0.05
@@ -195,6 +205,54 @@ class GUI_DisplayPanel(object):
         ### Half-span/step digits after decimal point (dimension units mode)
         self.spandec=4
 
+        ### Contrast sliders mode
+        # 'quantile' -> the sliders select percentiles of the data (a few hot pixels do not compress the slider range)
+        # 'linear' -> the sliders select values linearly between the minimum and maximum of the data
+        self.contrastmode='quantile'
+
+        ### Storage data type of the displayed data (applied when a file is prepared, see storage)
+        # 'auto' -> 64-bit floats are stored as float32, and 32/64-bit integers as the smallest of uint8, uint16 and int16 holding their values
+        # (float32, float16 and 8/16-bit integer data is kept as it is)
+        # None -> the data type of the input file is kept
+        # A numpy data type (for example 'float32' or 'uint16') -> the data is converted to it
+        self.zdtype='auto'
+
+        ### Memory limit of the prepared files cache (MB)
+        # The prepared data of the most recently selected files is kept in memory (see prepared)
+        self.cachemem=2048
+
+        ### Number of files prepared in the background before and after the selected file
+        # Browsing self.Files with the arrow keys shows the prefetched files without delay (0 -> no prefetching)
+        self.prefetchrange=2
+
+        ### Number of threads used to prefetch files
+        self.prefetchthreads=2
+
+        ### Memory limit of the loaded lazy input files cache (MB)
+        # The frames of a N-dimensional lazy input file are sliced from its loaded DataArray (see load_file)
+        self.loadmem=4096
+
+        ### Images with a side larger than pyramidsize (pixels) are displayed using a multi-resolution pyramid
+        # The displayed resolution follows the MainPlot zoom, such that the rendering cost tracks the screen size
+        # (None -> always display the full resolution image)
+        self.pyramidsize=2048
+
+        ### Margin of the displayed window of large images (fraction of the visible range on each side)
+        # Zoomed-in large images only display the visible pixels plus this margin (see updateimage)
+        self.cropmargin=0.5
+
+        ### Maximum refresh rate of the cursor dependent updates (frames per second)
+        # The updates requested by the cursors between two frames are run only once
+        # (None -> run the updates on every cursor movement)
+        self.maxfps=60
+
+        ### Profiling mode
+        # True -> record the time spent in the slots of the GUI signals and the rate of the cursor/range/key events
+        # The busiest slots and the event rates are shown in the status bar every second (see GUI_profile)
+        # The session summary is written to profilefile when the app is closed
+        self.profile=False
+        self.profilefile='DP_profile.json'
+
         ### Create cursors dictionaries (do not edit)
         self.dicts=[]
         for i in range(4):
@@ -367,6 +425,19 @@ class GUI_DisplayPanel(object):
         self.Files.setGeometry(QtCore.QRect(590, 620, 261, 121))
         self.Files.setObjectName("Files")
 
+        # Define frame slider (N-dimensional data)
+        self.Frames = QtWidgets.QSlider(self.centralwidget)
+        self.Frames.setGeometry(QtCore.QRect(590, 746, 261, 22))
+        self.Frames.setMaximum(0)
+        self.Frames.setOrientation(QtCore.Qt.Horizontal)
+        self.Frames.setEnabled(False)
+        self.Frames.setObjectName("Frames")
+
+        # Define frame label (N-dimensional data)
+        self.LabelFrame = QtWidgets.QLabel(self.centralwidget)
+        self.LabelFrame.setGeometry(QtCore.QRect(230, 750, 341, 16))
+        self.LabelFrame.setObjectName("LabelFrame")
+
         # Define other GUI elements
         self.DisplayPanel.setCentralWidget(self.centralwidget)
         self.menubar = QtWidgets.QMenuBar(self.DisplayPanel)
@@ -377,6 +448,14 @@ class GUI_DisplayPanel(object):
         self.statusbar.setObjectName("statusbar")
         self.DisplayPanel.setStatusBar(self.statusbar)
 
+        # Define loading progress bar (see update_progress)
+        self.Progress = QtWidgets.QProgressBar(self.statusbar)
+        self.Progress.setMaximumWidth(150)
+        self.Progress.setFormat("%v/%m")
+        self.Progress.setObjectName("Progress")
+        self.Progress.hide()
+        self.statusbar.addPermanentWidget(self.Progress)
+
         # Initialize widget's labels
         self.GUI_retranslate()
         QtCore.QMetaObject.connectSlotsByName(self.DisplayPanel)
@@ -423,6 +502,8 @@ class GUI_DisplayPanel(object):
         ResizeItem(self.DisplayPanel,self.LabelCsrMode)
         ResizeItem(self.DisplayPanel,self.DimorPix)
         ResizeItem(self.DisplayPanel,self.Files)
+        ResizeItem(self.DisplayPanel,self.Frames)
+        ResizeItem(self.DisplayPanel,self.LabelFrame)
 
     ############################################################################
 
@@ -441,6 +522,44 @@ class GUI_DisplayPanel(object):
         # Set the initial colormap
         self.Image.setLookupTable(self.colormap)
 
+        # Scheduler of the cursor dependent updates
+        # (See pyqt_ScheduleItem.py)
+        self.Schedule=ScheduleItem(self.maxfps)
+        self.Schedule.setFlushHooks(self.index_all,self.clear_index)
+
+        # Cursor indexes computed during a flush of the scheduler (see csr_index)
+        self.idx={}
+
+        # Profiler (profiling mode only, see GUI_profile)
+        self.Profiler=None
+
+        # Cache of prepared files
+        # (See numpy_CacheItem.py)
+        self.Prepared=CacheItem(self.cachemem*2**20)
+
+        # Thread pool and running workers (row -> worker) of the prefetched files
+        # (See pyqt_WorkerItem.py)
+        self.Pool=QtCore.QThreadPool()
+        self.Pool.setMaxThreadCount(self.prefetchthreads)
+        self.Prefetching={}
+
+        # Requested frame that is being prepared ((row,frame),keep), None when it is displayed (see request)
+        self.pending=None
+
+        # The GUI is constructed when the first input file is displayed (see show_file)
+        self.constructed=False
+
+        # Function called when the first input file is displayed (None -> nothing is called, see Run_DP.py)
+        self.firstshown=None
+
+        # Signal of the input files of a batch whose conversion is done (emitted from the threads of the batch)
+        # (See data_converters/batch2xarray.py)
+        self.Batch=WorkerSignals()
+        self.Batch.finished.connect(self.batch_done)
+
+        # Cache of loaded lazy input files
+        self.Loaded=CacheItem(self.loadmem*2**20)
+
         # Create cursor stats labels (force their height using setFixedHeight inherited to LabelItem from GraphicsWidget)
         self.labels=[]
         for i in range(6):
@@ -451,6 +570,9 @@ class GUI_DisplayPanel(object):
     ############################################################################
 
     # Retrieve input files
+    # The input files are DataArrays or lazy input files (see lazy2xarray.py)
+    # The files are loaded and prepared in the thread pool, the GUI stays responsive while they load
+    # (The GUI is constructed when the first input file is ready, see show_file)
     def GUI_files(self,files):
 
         # Store the input files in the Display Panel
@@ -460,46 +582,112 @@ class GUI_DisplayPanel(object):
         for item in self.files:
             self.Files.addItem(item.attrs['scan_name'])
 
-        # Select the first input file
-        self.Files.setCurrentItem(self.Files.item(0))
+        # Input files of a batch: disabled (listed in grey and not selectable) until their conversion is done
+        for row,item in enumerate(self.files):
+            if hasattr(item,'notify'):
+                self.Files.item(row).setFlags(self.Files.item(row).flags() & ~QtCore.Qt.ItemIsEnabled)
+                self.Files.item(row).setToolTip('Loading...')
+                item.notify(self.Batch.finished.emit)
+
+        # Signals when an item in self.Files is selected
+        self.Files.itemSelectionChanged.connect(self.select_file)
+
+        # Define the Display Panel data from the first input file (first frame)
+        # Input files that fail to load are reported and skipped (see loaded)
+        self.request((0,0))
+        self.prefetch([(0,0)]+[(r,0) for r in self.neighbours(0,len(self.files))])
 
-        # Define the Display Panel data from the first input file
-        self.GUI_setdata(**self.xarray2dict(self.files[0]))
+    # Select the Display Panel data from the list in self.Files
+    # The GUI elements are not re-created: the prepared data of the selected file is swapped into them
+    def select_file(self):
 
-        # Construct the Display Panel GUI initial content
-        self.GUI_initial()
+        # Drop the updates requested for the previous file
+        self.Schedule.clear()
 
-        # Create auxiliary signal objects
-        self.GUI_auxiliary()
+        # Define the Display Panel data from the selected input file (first frame)
+        # (An input file that fails to load is reported and the current data is kept)
+        row=self.Files.currentRow()
+        self.request((row,0))
 
-        # Initialize Display Panel GUI elements updates
-        self.GUI_connect(None)
+        # Prepare the files around the selected file in the background
+        self.prefetch([(row,0)]+[(r,0) for r in self.neighbours(row,len(self.files))])
 
-        # Select the Display Panel data from the list in self.Files
-        def select_file():
+    # Report an input file that failed to load (status bar and tool tip of its entry in self.Files)
+    def load_error(self,row,error):
 
-            # Disconnect all Display Panel GUI elements updates
-            self.GUI_disconnect(None)
+        name=self.files[row].attrs['scan_name']
+
+        self.Files.item(row).setForeground(QtGui.QBrush(QtCore.Qt.red))
+        self.Files.item(row).setToolTip(str(error))
+        self.statusbar.showMessage('Error loading '+name+': '+str(error),5000)
+
+    # Update the entry in self.Files of an input file of a batch whose conversion is done
+    # (Failed conversions stay disabled)
+    def batch_done(self,item):
+
+        row=next(r for r,f in enumerate(self.files) if f is item)
+
+        if item.error() is None:
+            self.Files.item(row).setFlags(self.Files.item(row).flags() | QtCore.Qt.ItemIsEnabled)
+            self.Files.item(row).setToolTip('')
+        else:
+            self.load_error(row,item.error())
 
-            # Clear the Display Panel GUI
-            self.MainPlot.clear()
-            self.MDCPlot.clear()
-            self.EDCPlot.clear()
-            self.CursorStats.clear()
+        self.update_progress()
 
-            # Clear PyQt5.QtWidgets.QGraphicsRectItem objects from the scene() in self.CursorStats.ci:
-            # These objects are created everytime a label is added in self.CursorStats
-            # These objects are not cleared using self.CursorStats.clear() and if they are not deleted
-            # they keep accumulating everytime a new file is selected
-            # Their accumulation considerably reduces the performance of the Display Panel
-            # Use the method .items() to see the all the items in self.CursorStats
-            # If the number of items is n, the first n-1 are PyQt5.QtWidgets.QGraphicsRectItem objects
-            # (Methods of an object: print([method for method in dir(obj) if callable(getattr(obj, method))]))
-            for i in range(len(self.CursorStats.items())-1):
-                self.CursorStats.ci.scene().removeItem(self.CursorStats.items()[0])
+    # Request the display of a frame of an input file
+    # key=(row,frame) -> row in self.Files and flattened index of the frame (0 for 2D data)
+    # keep=True -> keep the view and the cursors (see GUI_content)
+    # The prepared data is kept in a LRU cache, such that switching between recently used files is instant
+    # Otherwise the frame is prepared in the thread pool and displayed when it is ready (see loaded),
+    # a newer request replaces the pending one (its data is still cached when it is ready)
+    def request(self,key,keep=False):
 
-            # Define the Display Panel data from the selected input file
-            self.GUI_setdata(**self.xarray2dict(self.files[self.Files.currentRow()]))
+        prep=self.Prepared.get(key)
+
+        if prep is not None:
+            self.pending=None
+            self.show_file(key,prep,keep)
+            return
+
+        self.pending=(key,keep)
+
+        # Show the loading state in the status bar
+        self.statusbar.showMessage('Loading '+self.files[key[0]].attrs['scan_name']+'...')
+        self.update_progress()
+
+        # The frame is being prefetched
+        worker=self.Prefetching.get(key)
+        if worker is not None:
+
+            # Not started yet -> move it to the front of the queue
+            # (Started -> its result is displayed when it is done)
+            if self.Pool.tryTake(worker):
+                self.Pool.start(worker,1)
+
+        else:
+            worker=WorkerItem(self.prepare_file,*key)
+            worker.signals.finished.connect(partial(self.prefetched,key))
+            self.Prefetching[key]=worker
+            self.Pool.start(worker,1)
+
+    # Display a prepared frame of an input file
+    # The GUI is constructed the first time, then only its content is updated
+    def show_file(self,key,prep,keep):
+
+        row=key[0]
+
+        # The data of the entry is ready -> it can be selected (even if its batch notification is not delivered yet)
+        # (Selected without triggering select_file)
+        self.Files.item(row).setFlags(self.Files.item(row).flags() | QtCore.Qt.ItemIsEnabled)
+        if self.Files.currentRow() != row:
+            self.Files.blockSignals(True)
+            self.Files.setCurrentRow(row)
+            self.Files.blockSignals(False)
+
+        self.GUI_setdata(prep)
+
+        if not self.constructed:
 
             # Construct the Display Panel GUI initial content
             self.GUI_initial()
@@ -510,52 +698,395 @@ class GUI_DisplayPanel(object):
             # Initialize Display Panel GUI elements updates
             self.GUI_connect(None)
 
-        # Signals when an item in self.Files is selected
-        self.Files.itemSelectionChanged.connect(select_file)
+            # Set the side plots and the image (their updates are connected now)
+            self.refreshsides()
+            self.updateimage()
+
+            self.constructed=True
+
+            if self.firstshown is not None:
+                self.firstshown()
+
+        else:
+
+            # Update the Display Panel GUI content
+            self.GUI_content(keep=keep)
+
+        self.statusbar.clearMessage()
+        self.update_progress()
+
+    # Block until the requested frame is displayed (or failed), processing the Qt events meanwhile
+    # (For scripts and benchmarks that use the Display Panel right after GUI_files or a selection)
+    # (Returns if the Display Panel window is closed meanwhile)
+    def wait_loaded(self):
+        while self.pending is not None and self.DisplayPanel.isVisible():
+            QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents | QtCore.QEventLoop.WaitForMoreEvents)
+
+    # Show the loading progress in the status bar
+    # busy -> a requested frame is being prepared, otherwise the number of converted input files of a batch
+    def update_progress(self):
+
+        batch=[item for item in self.files if hasattr(item,'notify')]
+        done=sum(item.done() for item in batch)
+
+        if self.pending is not None:
+            self.Progress.setRange(0,0)
+            self.Progress.show()
+        elif done < len(batch):
+            self.Progress.setRange(0,len(batch))
+            self.Progress.setValue(done)
+            self.Progress.show()
+        else:
+            self.Progress.hide()
+
+    # Load an input file
+    # Lazy input files are converted here and kept in a LRU cache (the frames of N-dimensional data are sliced from it)
+    # (DataArray.load() returns the DataArray itself, DataArrays are not cached)
+    def load_file(self,row):
+
+        A=self.Loaded.get(row)
+
+        if A is None:
+            A=self.files[row].load()
+            if A is not self.files[row]:
+                self.Loaded.put(row,A)
+
+        return A
+
+    # Load and prepare a frame of an input file
+    # (Run by the workers of the thread pool, so the input files are loaded in the background)
+    def prepare_file(self,row,frame):
+        return self.GUI_prepare(**self.xarray2dict(self.load_file(row),frame))
+
+    # Indexes around i in a circular list of n elements (nearest first)
+    def neighbours(self,i,n):
+
+        js=[]
+        for d in range(1,self.prefetchrange+1):
+            for j in ((i+d)%n,(i-d)%n):
+                if j != i and j not in js:
+                    js.append(j)
+
+        return js
+
+    # Prepare the frames of the input files in keys in the background
+    # keys -> list of (row,frame) keys, the first keys are prepared first
+    # The workers of the keys that are not in keys are cancelled (the user jumped far away)
+    def prefetch(self,keys):
+
+        # Cancel the workers that are no longer needed
+        for key in list(self.Prefetching):
+            if key not in keys:
+                worker=self.Prefetching.pop(key)
+                self.Pool.tryTake(worker)
+                worker.cancel()
+
+        # Start the workers of the keys that are not prepared yet
+        for key in keys:
+            if key not in self.Prepared and key not in self.Prefetching:
+                worker=WorkerItem(self.prepare_file,*key)
+                worker.signals.finished.connect(partial(self.prefetched,key))
+                self.Prefetching[key]=worker
+                self.Pool.start(worker)
+
+    # Store the result of a worker (run in the GUI thread)
+    def prefetched(self,key,worker):
+
+        # Ignore cancelled or replaced workers
+        if self.Prefetching.get(key) is not worker:
+            return
+
+        del self.Prefetching[key]
+
+        if worker.error is None:
+            self.Prepared.put(key,worker.result)
+
+        # Display the requested frame
+        if self.pending is not None and self.pending[0] == key:
+            self.loaded(worker)
+
+    # Display the result of the worker of the requested frame
+    # A failed input file is reported, before the GUI is constructed the next input file is requested
+    def loaded(self,worker):
+
+        key,keep=self.pending
+
+        if worker.error is None:
+            self.pending=None
+            self.show_file(key,worker.result,keep)
+            return
+
+        self.load_error(key[0],worker.error)
+
+        if not self.constructed and key[0]+1 < len(self.files):
+            self.request((key[0]+1,0))
+        else:
+            self.pending=None
+            self.update_progress()
+            if not self.constructed:
+                self.statusbar.showMessage('None of the input files could be loaded')
+
+    # Select a frame of N-dimensional data
+    # The view and the cursors are kept, only the data dependent content is updated
+    def select_frame(self):
+
+        row=self.Files.currentRow()
+        frame=self.Frames.value()
+
+        # Define the Display Panel data from the selected frame
+        self.request((row,frame),keep=True)
+
+        # Prepare the frames around the selected frame in the background
+        self.prefetch([(row,frame)]+[(row,f) for f in self.neighbours(frame,self.frames)])
+
+    ############################################################################
+
+    # Prepare GUI data
+    # Everything that depends only on the input data is computed here (once per file)
+    # (This method does not modify the Display Panel, the results are returned in a dictionary)
+    def GUI_prepare(self, x, y, z, xdim, ydim, zdim, xuts, yuts, zuts, frame=0, frames=1, ftext=''):
+
+        # Statistics of z: minimum, maximum, NaN mask and percentile table (0%, 1%, ..., 100%) for the contrast sliders
+        # (Computed once per prepared file, NaN values are ignored)
+        # (See numpy_StatsItem.py)
+        zstats=StatsItem(z)
+
+        # Convert the data to its storage data type
+        z=self.storage(z,zstats)
+
+        prep={'x':x,'y':y,'z':z,'xdim':xdim,'ydim':ydim,'zdim':zdim,'xuts':xuts,'yuts':yuts,'zuts':zuts,'frame':frame,'frames':frames,'ftext':ftext}
+
+        # Create the coordinate to index mappings of the x and y axes
+        # (See numpy_AxisIndexItem.py)
+        prep['xidx']=AxisIndexItem(x)
+        prep['yidx']=AxisIndexItem(y)
+
+        # Statistics and percentile table of z
+        prep['zstats']=zstats
+        prep['zq']=prep['zstats'].q
+
+        # Extract z parameters
+        prep['z_min']=prep['zstats'].min
+        prep['z_max']=prep['zstats'].max
+
+        # The array displayed in the ImageItem
+        # Flipping is needed to account for the difference between coordinates and indexes
+        # Non-uniform axes are resampled to a uniform display grid (every pixel shows the data element closest to its center)
+        # (The flip of the y-axis is included in its grid, the data is copied once)
+        gx=prep['xidx'].grid()
+        gy=prep['yidx'].grid(reverse=True)
+        if gx is None and gy is None:
+            prep['zz']=np.fliplr(z)
+        elif gy is None:
+            prep['zz']=np.fliplr(z)[gx]
+        elif gx is None:
+            prep['zz']=z[:,gy]
+        else:
+            prep['zz']=z[np.ix_(gx,gy)]
+
+        # Multi-resolution pyramid of the displayed array (large images only)
+        # (See numpy_PyramidItem.py)
+        if self.pyramidsize and max(prep['zz'].shape) > self.pyramidsize:
+            prep['pyramid']=PyramidItem(prep['zz'])
+        else:
+            prep['pyramid']=None
+
+        # Prefix sums of z along x (rows) and y (columns) for the MDC/EDC integration
+        # The average of z over the indexes a..b is the difference of two rows of prefix sums (the cost does not depend on the span b-a)
+        # The prefix sums are computed on the first integration along their axis (see meanx and meany)
+        # Float data is accumulated in float64 to avoid the loss of precision of long sums
+        # Integer data is accumulated in int32 (int64 if needed) and the sums are exact
+        # (See numpy_PrefixSumItem.py)
+        if np.issubdtype(z.dtype,np.integer):
+            zabs=max(abs(int(prep['z_min'])),abs(int(prep['z_max'])))
+            if max(len(x),len(y))*zabs < 2**31:
+                zcdtype=np.int32
+            elif max(len(x),len(y))*zabs < 2**63:
+                zcdtype=np.int64
+            else:
+                zcdtype=np.float64
+        else:
+            zcdtype=np.float64
+
+        # Data with NaN values: the integration averages the non-NaN values only (mask of the non-NaN values)
+        prep['zcx']=PrefixSumItem(z,0,zcdtype,zstats.valid)
+        prep['zcy']=PrefixSumItem(z,1,zcdtype,zstats.valid)
+
+        return prep
+
+    # Convert the data to its storage data type (see zdtype in mysetup)
+    # (The data is not copied if it already has the storage data type)
+    # (zstats -> statistics of z, see numpy_StatsItem.py)
+    def storage(self,z,zstats):
+
+        if self.zdtype is None:
+            return z
+
+        if self.zdtype != 'auto':
+            return z.astype(self.zdtype,copy=False)
+
+        # 64-bit floats -> float32
+        if np.issubdtype(z.dtype,np.floating):
+            if z.dtype.itemsize > 4:
+                return z.astype(np.float32)
+            return z
+
+        # 32/64-bit integers -> smallest 8/16-bit integer type holding the values
+        if np.issubdtype(z.dtype,np.integer) and z.dtype.itemsize > 2 and z.size:
+            for t in (np.uint8,np.uint16,np.int16):
+                if np.iinfo(t).min <= zstats.min and zstats.max <= np.iinfo(t).max:
+                    return z.astype(t)
+
+        return z
 
     ############################################################################
 
     # Set GUI data
-    def GUI_setdata(self, x, y, z, xdim, ydim, zdim, xuts, yuts, zuts):
+    # (prep is the dictionary returned by GUI_prepare)
+    def GUI_setdata(self, prep):
 
         # Convert the input data to attributes of the Display Panel
-        self.x=x
-        self.y=y
-        self.z=z
+        self.x=prep['x']
+        self.y=prep['y']
+        self.z=prep['z']
+
+        self.xdim=prep['xdim']
+        self.ydim=prep['ydim']
+        self.zdim=prep['zdim']
 
-        self.xdim=xdim
-        self.ydim=ydim
-        self.zdim=zdim
+        self.xuts=prep['xuts']
+        self.yuts=prep['yuts']
+        self.zuts=prep['zuts']
 
-        self.xuts=xuts
-        self.yuts=yuts
-        self.zuts=zuts
+        # Frame of N-dimensional data (index, number of frames and description)
+        self.frame=prep['frame']
+        self.frames=prep['frames']
+        self.ftext=prep['ftext']
+
+        # Coordinate to index mappings of the x and y axes
+        self.xidx=prep['xidx']
+        self.yidx=prep['yidx']
 
         # Extract x parameters
-        self.x_min=min(self.x)
-        self.x_max=max(self.x)
-        self.x_size=len(self.x)
-        self.x_delta=x[1]-x[0]
+        self.x_min=self.xidx.min
+        self.x_max=self.xidx.max
+        self.x_size=self.xidx.size
+        self.x_delta=self.xidx.delta
 
         # Extract y parameters
-        self.y_min=min(self.y)
-        self.y_max=max(self.y)
-        self.y_size=len(self.y)
-        self.y_delta=y[1]-y[0]
+        self.y_min=self.yidx.min
+        self.y_max=self.yidx.max
+        self.y_size=self.yidx.size
+        self.y_delta=self.yidx.delta
 
         # Extract z parameters
-        self.z_min=np.min(self.z)
-        self.z_max=np.max(self.z)
+        self.z_min=prep['z_min']
+        self.z_max=prep['z_max']
 
-        # The array displayed in the ImageItem
-        # Flipping is needed to account for the difference between coordinates and indexes
-        self.zz=np.fliplr(self.z)
+        # Statistics and percentile table of z
+        self.zstats=prep['zstats']
+        self.zq=prep['zq']
+
+        # The array displayed in the ImageItem and its multi-resolution pyramid
+        self.zz=prep['zz']
+        self.pyramid=prep['pyramid']
+
+        # Prefix sums of z for the MDC/EDC integration
+        self.zcx=prep['zcx']
+        self.zcy=prep['zcy']
 
     ############################################################################
 
-    # Construct Display Panel GUI initial content (dependant on loaded data)
+    # Construct Display Panel GUI initial content
+    # The GUI elements are created once, their data dependent content is set in GUI_content
     def GUI_initial(self):
 
+        ### MainPlot image initialization:
+
+        # Add image object in MainPlot
+        self.MainPlot.addItem(self.Image)
+
+        ########################################################################
+
+        ### Internal GUI elements setup:
+
+        # Create the cursors in Mainplot
+        # (See pyqt_CursorItem.py)
+        # The cursors are created once and are never reinitialized:
+        # Reinitializing the cursors using self.cursors[i].__init__() decreases the performance of zooming/panning
+        # in self.MainPlot (and of the 'hide/show all' functionality) everytime it happens
+        # (Apparently due to some kind of system saturation when invoking pg.GraphItem.__init__(self) too many times)
+        # When a new file is selected only the cursor positions are updated (see GUI_content)
+        self.cursors=[]
+        for i in range(4):
+            self.cursors.append(CursorItem())
+
+        # Add the leader cursors in MainPlot
+        for i in range(2):
+            self.MainPlot.addItem(self.cursors[i])
+
+        # Set the initial cursors configuration
+        # (The cursor positions are set in GUI_content)
+        for i in range(4):
+            self.cursors[i].setData(pos=np.array([[self.x_min,self.y_min]]), **self.dicts[i])
+
+        # Create infinite vertical lines in MDCPlot (vertical side cursors)
+        self.scsrvs=[]
+        for i in range(4):
+            self.scsrvs.append(pg.InfiniteLine(pos=self.cursors[i].data['pos'][0][0],angle=90,pen=self.csrcs[i]))
+
+        # Add the leader vertical side cursors in MainPlot
+        for i in range(2):
+            self.MDCPlot.addItem(self.scsrvs[i])
+
+        # Create infinite horizontal lines in EDCPlot (horizontal side cursors)
+        self.scsrhs=[]
+        for i in range(4):
+            self.scsrhs.append(pg.InfiniteLine(pos=self.cursors[i].data['pos'][0][1],angle=0,pen=self.csrcs[i]))
+
+        # Add the leader horizontal side cursors in MainPlot
+        for i in range(2):
+            self.EDCPlot.addItem(self.scsrhs[i])
+
+        # Add the cursor stats labels in CursorStats
+        self.CursorStats.addItem(self.labels[0],row=0,col=0) # Cursor 1 (leader)
+        self.CursorStats.addItem(self.labels[1],row=1,col=0) # Cursor 2 (leader)
+        self.CursorStats.addItem(self.labels[4],row=0,col=1) # Delta dx dy
+        self.CursorStats.addItem(self.labels[5],row=1,col=1) # Delta dz dr dc
+
+        # Create the side plots
+        # The side plots are created once and then updated in place using setData (see updateMDC and updateEDC)
+        self.MDCs=[]
+        self.EDCs=[]
+        for i in range(4):
+            self.MDCs.append(pg.PlotDataItem(pen=self.sidecs[i]))
+            self.EDCs.append(pg.PlotDataItem(pen=self.sidecs[i]))
+
+        # Add the leader side plots
+        for i in range(2):
+            self.MDCPlot.addItem(self.MDCs[i])
+            self.EDCPlot.addItem(self.EDCs[i])
+
+        # Integration buffers of the side plots (see GUI_content)
+        self.MDCbufs=[]
+        self.EDCbufs=[]
+
+        # Initialize the signals array
+        # self.cns[0] = None, such that the signal count starts at 1
+        self.cns=[None]+[False]*self.GUI_connect([0])
+
+        ########################################################################
+
+        ### Set the data dependent content
+        self.GUI_content()
+
+    ############################################################################
+
+    # Set the Display Panel GUI content (dependant on loaded data)
+    # (Run when the GUI is constructed and everytime a new file is selected)
+    # keep=True -> keep the view and the cursors (a new frame of N-dimensional data is selected, see select_frame)
+    def GUI_content(self,keep=False):
+
         ### Set the axis labels
 
         # MainPlot
@@ -579,11 +1110,30 @@ class GUI_DisplayPanel(object):
 
         ########################################################################
 
-        ### Set the initial range for the cursor integration spinboxes
+        ### Set the frame slider and label (N-dimensional data)
+
+        # The slider is set without triggering select_frame
+        self.Frames.blockSignals(True)
+        self.Frames.setMaximum(self.frames-1)
+        self.Frames.setValue(self.frame)
+        self.Frames.setEnabled(self.frames > 1)
+        self.Frames.blockSignals(False)
+
+        self.LabelFrame.setText(self.ftext)
+
+        ########################################################################
+
+        ### Set the range for the cursor integration spinboxes
+
+        # Pixels
+        if self.DimorPix.isChecked():
+            self.SpanX.setMaximum(self.x_size)
+            self.SpanY.setMaximum(self.y_size)
 
-        # (Initially the cursor integration is in dimension units)
-        self.SpanX.setMaximum(self.x_max-self.x_min)
-        self.SpanY.setMaximum(self.y_max-self.y_min)
+        # Dimension units
+        else:
+            self.SpanX.setMaximum(self.x_max-self.x_min)
+            self.SpanY.setMaximum(self.y_max-self.y_min)
 
         ########################################################################
 
@@ -605,19 +1155,18 @@ class GUI_DisplayPanel(object):
 
         ########################################################################
 
-        ### MainPlot image initialization:
-
-        # Add image object in MainPlot
-        self.MainPlot.addItem(self.Image)
+        ### MainPlot image:
 
         # Create limits rectangle for the data in MainPlot
-        self.ImageRectangle=QtCore.QRectF(self.x_min,self.y_max,self.x_max-self.x_min,self.y_min-self.y_max)
-
-        # Plot 2D data in MainPlot
-        self.Image.setImage(self.zz)
+        # (The first row of self.zz is placed at the x[0] side and its first column at the y[-1] side, such that descending axes are also drawn correctly)
+        # (The rectangle extends half a step beyond the first and last elements, such that every pixel is centered on its coordinates, see AxisIndexItem)
+        self.ImageRectangle=QtCore.QRectF(self.xidx.start,self.yidx.stop,self.xidx.stop-self.xidx.start,self.yidx.start-self.yidx.stop)
 
-        # Scale 2D data in MainPlot
-        self.Image.setRect(self.ImageRectangle)
+        # Plot and scale 2D data in MainPlot
+        # (The resolution and the displayed window are chosen according to the MainPlot range, see updateimage)
+        # (The image is displayed once the MainPlot range is set, see below)
+        self.level=None
+        self.crop=None
 
         ########################################################################
 
@@ -641,18 +1190,28 @@ class GUI_DisplayPanel(object):
         ########################################################################
 
         ### Set the initial range of MainPlot, EDCPlot and MDCPlot:
+        # (Only when the view is not kept)
+
+        if not keep:
+
+            # Set the initial range of MainPlot
+            self.MainPlot.getViewBox().setXRange(self.le,self.re,padding=0)
+            self.MainPlot.getViewBox().setYRange(self.be,self.te,padding=0)
 
-        # Set the initial range of MainPlot
-        self.MainPlot.getViewBox().setXRange(self.le,self.re,padding=0)
-        self.MainPlot.getViewBox().setYRange(self.be,self.te,padding=0)
+            # Set the initial range of EDCPlot and MDCPlot equal to MainPlot
+            self.MDCPlot.getViewBox().setXRange(self.le,self.re,padding=0)
+            self.EDCPlot.getViewBox().setYRange(self.be,self.te,padding=0)
 
-        # Set the initial range of EDCPlot and MDCPlot equal to MainPlot
-        self.MDCPlot.getViewBox().setXRange(self.le,self.re,padding=0)
-        self.EDCPlot.getViewBox().setYRange(self.be,self.te,padding=0)
+            # Set the initial range of EDCPlot and MDCPlot intensity equal to the z limits of the data in MainPlot
+            self.MDCPlot.setYRange(self.z_min,self.z_max,padding=0)
+            self.EDCPlot.setXRange(self.z_min,self.z_max,padding=0)
 
-        # Set the initial range of EDCPlot and MDCPlot intensity equal to the z limits of the data in MainPlot
-        self.MDCPlot.setYRange(self.z_min,self.z_max,padding=0)
-        self.EDCPlot.setXRange(self.z_min,self.z_max,padding=0)
+        # Display the image for the MainPlot range
+        # (When the GUI is constructed it is displayed again after its updates are connected, see show_file)
+        self.updateimage()
+
+        # Set the image levels according to the contrast sliders
+        self.contrast()
 
         ########################################################################
 
@@ -667,20 +1226,7 @@ class GUI_DisplayPanel(object):
 
         ########################################################################
 
-        ### Internal GUI elements setup:
-
-        # Delete/create the cursors in Mainplot
-        # (See pyqt_CursorItem.py)
-        # If the cursors are created during the call to GUI_internal and then they are reinitialized
-        # using self.cursors[i].__init__() in GUI_files, the performance of zooming/panning in self.MainPlot
-        # decreases slowly everytime a new file is selected
-        # (For some reason) the same happens to the 'hide/show all' functionality
-        # This behaviour seems not to be related with the accumulation of spurious objects, but rather with
-        # some kind of system saturation when invoking pg.GraphItem.__init__(self) too many times in pyqt_CursorItem.py
-        # Deleting/creating the cursors everytime a new file is selected fixes this issue at no cost
-        self.cursors=[]
-        for i in range(4):
-            self.cursors.append(CursorItem())
+        ### Internal GUI elements content:
 
         # Define the zoom/cursor objects space
         self.space=[[self.x_min,self.y_min],[self.x_max,self.y_max]]
@@ -696,40 +1242,139 @@ class GUI_DisplayPanel(object):
         for i in range(4):
             self.cursors[i].setSpace(self.space)
 
-        # Add the leader cursors in MainPlot
-        for i in range(2):
-            self.MainPlot.addItem(self.cursors[i])
+        # Reallocate the integration buffers of the side plots if the data size changed
+        if len(self.MDCbufs) == 0 or len(self.MDCbufs[0]) != self.x_size:
+            self.MDCbufs=[np.empty(self.x_size) for i in range(4)]
+        if len(self.EDCbufs) == 0 or len(self.EDCbufs[0]) != self.y_size:
+            self.EDCbufs=[np.empty(self.y_size) for i in range(4)]
 
-        # Get the initial MainPlot range
-        self.rng0=self.MainPlot.viewRange()
+        # Keep the cursors: refresh the cursor stats labels info
+        if keep:
 
-        # Set the initial cursors configuration
-        for i in range(4):
-            self.cursors[i].setData(pos=np.array([[self.dcp(self.rng0,i+1,0),self.dcp(self.rng0,i+1,1)]]), **self.dicts[i])
+            for i in range(4):
+                self.updateinfo(i+1)
 
-        # Create infinite vertical lines in MDCPlot (vertical side cursors)
-        self.scsrvs=[]
-        for i in range(4):
-            self.scsrvs.append(pg.InfiniteLine(pos=self.cursors[i].data['pos'][0][0],angle=90,pen=self.csrcs[i]))
+            self.updatedelta()
 
-        # Add the leader vertical side cursors in MainPlot
-        for i in range(2):
-            self.MDCPlot.addItem(self.scsrvs[i])
+        # Set the initial cursors
+        else:
+            self.GUI_cursors()
 
-        # Create infinite horizontal lines in EDCPlot (horizontal side cursors)
-        self.scsrhs=[]
+        # Set the side plots
+        # (When the GUI is constructed the side plots are set after their updates are connected, see show_file)
+        self.refreshsides()
+
+        # Set the whole range integration plots
+        # (See integrateallx and integrateally)
+        if self.allX.isChecked():
+            self.iX.setData(self.meanx(0,self.x_size-1),self.y)
+            self.iregionX.setRegion((self.x_min,self.x_max))
+        if self.allY.isChecked():
+            self.iY.setData(self.x,self.meany(0,self.y_size-1))
+            self.iregionY.setRegion((self.y_min,self.y_max))
+
+    # Refresh the side plots of the cursors
+    # (Only the side plots in MDCPlot and EDCPlot, hidden side plots are refreshed when they are shown)
+    # (The side plots whose updates are disconnected are skipped, see updateMDC and updateEDC)
+    def refreshsides(self):
         for i in range(4):
-            self.scsrhs.append(pg.InfiniteLine(pos=self.cursors[i].data['pos'][0][1],angle=0,pen=self.csrcs[i]))
+            if self.MDCs[i].scene() is not None:
+                self.updateMDC(i+1)
+            if self.EDCs[i].scene() is not None:
+                self.updateEDC(i+1)
 
-        # Add the leader horizontal side cursors in MainPlot
-        for i in range(2):
-            self.EDCPlot.addItem(self.scsrhs[i])
+    # Display the image in MainPlot
+    # Large images (with a pyramid) are displayed:
+    # -> At the level of the pyramid matching the MainPlot resolution (the coarsest level whose pixels are not larger than the screen pixels)
+    # -> Cropped to the visible window plus a margin (the window is only recomputed when the view leaves it or becomes much smaller)
+    def updateimage(self):
 
-        # Add the cursor stats labels in CursorStats
-        self.CursorStats.addItem(self.labels[0],row=0,col=0) # Cursor 1 (leader)
-        self.CursorStats.addItem(self.labels[1],row=1,col=0) # Cursor 2 (leader)
-        self.CursorStats.addItem(self.labels[4],row=0,col=1) # Delta dx dy
-        self.CursorStats.addItem(self.labels[5],row=1,col=1) # Delta dz dr dc
+        r=self.ImageRectangle
+
+        if self.pyramid is None:
+            k=0
+            crop=None
+
+        else:
+
+            vb=self.MainPlot.getViewBox()
+
+            # Size of a screen pixel in data coordinates
+            px,py=vb.viewPixelSize()
+
+            # Displayed pixels per screen pixel
+            rx=abs(px*self.zz.shape[0]/r.width())
+            ry=abs(py*self.zz.shape[1]/r.height())
+
+            k=self.pyramid.level(min(rx,ry))
+
+            # Level shape and pixel size in data coordinates (signed, the rectangle can have negative sizes)
+            w,h=self.pyramid.levels[k].shape
+            sx,sy=self.pyramid.scale(k)
+            dx=r.width()*sx/w
+            dy=r.height()*sy/h
+
+            # Visible window in level indexes
+            (x0,x1),(y0,y1)=vb.viewRange()
+            i0,i1=sorted(((x0-r.x())/dx,(x1-r.x())/dx))
+            j0,j1=sorted(((y0-r.y())/dy,(y1-r.y())/dy))
+            i0,i1=max(int(i0),0),min(int(np.ceil(i1)),w)
+            j0,j1=max(int(j0),0),min(int(np.ceil(j1)),h)
+
+            # Keep the current window if it is at the same level, contains the visible window and is not much larger
+            # (4 times the area of the visible window plus margin)
+            mi=int((i1-i0)*self.cropmargin)
+            mj=int((j1-j0)*self.cropmargin)
+            c=self.crop
+            if k == self.level and c is not None and c[0] <= i0 and c[1] >= i1 and c[2] <= j0 and c[3] >= j1 and (c[1]-c[0])*(c[3]-c[2]) <= 4*(i1-i0+2*mi)*(j1-j0+2*mj):
+                return
+
+            # New window: visible window plus margin (quantized to 64 pixels)
+            crop=(max((i0-mi)//64*64,0),min(-(-(i1+mi)//64)*64,w),max((j0-mj)//64*64,0),min(-(-(j1+mj)//64)*64,h))
+
+        # Skip if nothing changed
+        if k == self.level and crop == self.crop:
+            return
+
+        self.level=k
+        self.crop=crop
+
+        # Full resolution (small images)
+        if crop is None:
+            self.Image.setImage(self.zz,autoLevels=False)
+            self.Image.setRect(r)
+
+        # Window of a level of the pyramid
+        # (Slicing returns a view, the data is not copied)
+        else:
+            a0,a1,b0,b1=crop
+            self.Image.setImage(self.pyramid.levels[k][a0:a1,b0:b1],autoLevels=False)
+            self.Image.setRect(QtCore.QRectF(r.x()+a0*dx,r.y()+b0*dy,(a1-a0)*dx,(b1-b0)*dy))
+
+    # Set the initial cursors (positions and cursor stats labels info)
+    def GUI_cursors(self):
+
+        # Get the initial MainPlot range
+        self.rng0=self.MainPlot.viewRange()
+
+        # Set the initial cursors positions
+        for i,item in enumerate(self.cursors):
+
+            pos=np.array([[self.dcp(self.rng0,i+1,0),self.dcp(self.rng0,i+1,1)]])
+
+            # Cursors in MainPlot
+            # (The cursor dependent updates are requested through the cursor signals)
+            if item in self.MainPlot.getViewBox().allChildren():
+                item.setData(pos=pos, **self.dicts[i])
+
+            # Hidden cursors
+            # (Only their position is stored, they are refreshed when they are shown, see showhide)
+            else:
+                item.data['pos']=pos
+
+            # Side cursors
+            self.scsrvs[i].setValue(pos[0][0])
+            self.scsrhs[i].setValue(pos[0][1])
 
         # Set the initial cursor stats labels info (cursors)
         for i in range(4):
@@ -738,21 +1383,6 @@ class GUI_DisplayPanel(object):
         # Set the initial cursor stats labels info (leader cursors delta)
         self.defdelta()
 
-        # Set the initial side plots
-        self.MDCs=[]
-        self.EDCs=[]
-        for i in range(4):
-            if i<2:
-                self.MDCs.append(self.MDCPlot.plot(self.x,self.z[:,self.find_nearest(self.y,self.cursors[i].data['pos'][0][1])], pen=self.sidecs[i]))
-                self.EDCs.append(self.EDCPlot.plot(self.z[self.find_nearest(self.x,self.cursors[i].data['pos'][0][0]),:],self.y, pen=self.sidecs[i]))
-            else:
-                self.MDCs.append(None)
-                self.EDCs.append(None)
-
-        # Initialize the signals array
-        # self.cns[0] = None, such that the signal count starts at 1
-        self.cns=[None]+[False]*self.GUI_connect([0])
-
     ############################################################################
 
     # Create auxiliary signal objects
@@ -761,39 +1391,47 @@ class GUI_DisplayPanel(object):
         # Lambda functions can be used to pass arguments to a connected function
         # Partials can be used to pass arguments to a connected function while also handling event objects
 
+        # The cursor dependent updates (signal objects 1 to 18) are not run directly:
+        # They are requested to the scheduler, which runs them at most once per frame (see schedule)
+
         #----------------------------------------------------------------------#
 
         # Update side cursors
         self.update_scsrs=[None]*4
-        self.update_scsrs[0]=lambda: self.update_scsr(1) # Signal object 1
-        self.update_scsrs[1]=lambda: self.update_scsr(2) # Signal object 2
-        self.update_scsrs[2]=lambda: self.update_scsr(3) # Signal object 3
-        self.update_scsrs[3]=lambda: self.update_scsr(4) # Signal object 4
+        self.update_scsrs[0]=lambda: self.schedule(self.update_scsr,1) # Signal object 1
+        self.update_scsrs[1]=lambda: self.schedule(self.update_scsr,2) # Signal object 2
+        self.update_scsrs[2]=lambda: self.schedule(self.update_scsr,3) # Signal object 3
+        self.update_scsrs[3]=lambda: self.schedule(self.update_scsr,4) # Signal object 4
 
         #----------------------------------------------------------------------#
 
         # Update cursor stats labels info (cursors)
         self.updateinfos=[None]*4
-        self.updateinfos[0]=lambda: self.updateinfo(1) # Signal object 5
-        self.updateinfos[1]=lambda: self.updateinfo(2) # Signal object 6
-        self.updateinfos[2]=lambda: self.updateinfo(3) # Signal object 7
-        self.updateinfos[3]=lambda: self.updateinfo(4) # Signal object 8
+        self.updateinfos[0]=lambda: self.schedule(self.updateinfo,1) # Signal object 5
+        self.updateinfos[1]=lambda: self.schedule(self.updateinfo,2) # Signal object 6
+        self.updateinfos[2]=lambda: self.schedule(self.updateinfo,3) # Signal object 7
+        self.updateinfos[3]=lambda: self.schedule(self.updateinfo,4) # Signal object 8
+
+        #----------------------------------------------------------------------#
+
+        # Update cursor stats labels info (leader cursors delta)
+        self.updatedelta_sig=lambda: self.schedule(self.updatedelta) # Signal objects 9 and 10
 
         #----------------------------------------------------------------------#
 
         # Update MDCs
         self.updateMDCs=[None]*4
-        self.updateMDCs[0]=lambda: self.updateMDC(1) # Signal object 11
-        self.updateMDCs[1]=lambda: self.updateMDC(2) # Signal object 12
-        self.updateMDCs[2]=lambda: self.updateMDC(3) # Signal object 13
-        self.updateMDCs[3]=lambda: self.updateMDC(4) # Signal object 14
+        self.updateMDCs[0]=lambda: self.schedule(self.updateMDC,1) # Signal object 11
+        self.updateMDCs[1]=lambda: self.schedule(self.updateMDC,2) # Signal object 12
+        self.updateMDCs[2]=lambda: self.schedule(self.updateMDC,3) # Signal object 13
+        self.updateMDCs[3]=lambda: self.schedule(self.updateMDC,4) # Signal object 14
 
         # Update EDCs
         self.updateEDCs=[None]*4
-        self.updateEDCs[0]=lambda: self.updateEDC(1) # Signal object 15
-        self.updateEDCs[1]=lambda: self.updateEDC(2) # Signal object 16
-        self.updateEDCs[2]=lambda: self.updateEDC(3) # Signal object 17
-        self.updateEDCs[3]=lambda: self.updateEDC(4) # Signal object 18
+        self.updateEDCs[0]=lambda: self.schedule(self.updateEDC,1) # Signal object 15
+        self.updateEDCs[1]=lambda: self.schedule(self.updateEDC,2) # Signal object 16
+        self.updateEDCs[2]=lambda: self.schedule(self.updateEDC,3) # Signal object 17
+        self.updateEDCs[3]=lambda: self.schedule(self.updateEDC,4) # Signal object 18
 
         #----------------------------------------------------------------------#
 
@@ -886,6 +1524,75 @@ class GUI_DisplayPanel(object):
         # Signals when allY checkbox is checked/unchecked
         self.integrateally_sig=partial(self.integrateally,[11,12,13,14,36,37,38,39]) # Signal object 61
 
+        #----------------------------------------------------------------------#
+
+        # Select a frame of N-dimensional data
+        # (Requested to the scheduler, dragging the frame slider selects at most one frame per refresh)
+        self.select_frame_sig=lambda: self.schedule(self.select_frame) # Signal object 66
+
+        # Update the resolution and the displayed window of the image in MainPlot
+        self.updateimage_sig=lambda: self.schedule(self.updateimage) # Signal object 67
+
+        #----------------------------------------------------------------------#
+
+        # Profiling mode (the slots are wrapped before they are connected)
+        if self.profile:
+            self.GUI_profile()
+
+    ############################################################################
+
+    # Profiling mode
+    # (See pyqt_ProfilerItem.py)
+    def GUI_profile(self):
+
+        self.Profiler=ProfilerItem()
+
+        # Wrapped scheduled updates (scheduler key -> wrapped update, see schedule)
+        self.profiled={}
+
+        # Wrap the slots of the signal objects
+        # The wrapped slots replace the attributes used in GUI_connect and GUI_disconnect
+        # The slot times are recorded by signal object number (shared slots are recorded under their first number)
+        def wrap(i,name,index=None):
+            if index is None:
+                setattr(self,name,self.Profiler.wrap('%i %s'%(i,name),getattr(self,name)))
+            else:
+                getattr(self,name)[index]=self.Profiler.wrap('%i %s[%i]'%(i,name,index),getattr(self,name)[index])
+
+        for j in range(4):
+            wrap(1+j,'update_scsrs',j) # Signal objects 1 to 4
+            wrap(5+j,'updateinfos',j) # Signal objects 5 to 8
+            wrap(11+j,'updateMDCs',j) # Signal objects 11 to 14
+            wrap(15+j,'updateEDCs',j) # Signal objects 15 to 18
+            wrap(32+j,'showhides',j) # Signal objects 32 to 35
+            wrap(36+j,'hsMDCs',j) # Signal objects 36 to 39
+            wrap(40+j,'hsEDCs',j) # Signal objects 40 to 43
+            wrap(46+j,'switchcsrs',j) # Signal objects 46 to 49
+            wrap(50+j,'iswitchcsrs',j) # Signal objects 50 to 53
+
+        wrap(25,'csrs_mov',0)
+        for j in range(1,4):
+            wrap(25+j,'csrs_kmov',j) # Signal objects 26 to 28
+
+        for i,name in [(9,'updatedelta_sig'),(19,'follow'),(20,'resetcsrs_sig'),(21,'updatesides'),(22,'updatemainfromMDC'),(23,'updatemainfromEDC'),
+                       (24,'bilateral'),(29,'karrowall_sig'),(30,'hidecurrent_sig'),(31,'showcurrent_sig'),(44,'lineupv_sig'),(45,'lineuph_sig'),
+                       (54,'fadeicsrc_sig'),(55,'dim2pix'),(56,'stepx'),(57,'stepy'),(58,'changeix'),(59,'changeiy'),(60,'integrateallx_sig'),
+                       (61,'integrateally_sig'),(62,'contrast'),(64,'invert'),(65,'cmap_select'),(66,'select_frame_sig'),(67,'updateimage_sig')]:
+            wrap(i,name)
+
+        # Count the cursor, range and key events
+        for item in self.cursors:
+            item.scatter.sigPlotChanged.connect(self.Profiler.counter('sigPlotChanged'))
+        for plot in (self.MainPlot,self.MDCPlot,self.EDCPlot):
+            plot.sigRangeChanged.connect(self.Profiler.counter('sigRangeChanged'))
+        self.MainPlot.sigKeyPress.connect(self.Profiler.counter('sigKeyPress'))
+
+        # Show the periodic report in the status bar
+        self.Profiler.setDisplay(self.statusbar.showMessage)
+
+        # Write the session summary when the app is closed
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(lambda: self.Profiler.dump(self.profilefile))
+
     ############################################################################
 
     # Connect Display Panel GUI elements updates
@@ -960,13 +1667,13 @@ class GUI_DisplayPanel(object):
         i = 9
         if not cn or i in cn:
             if self.cns[i] == False:
-                self.cursors[0].scatter.sigPlotChanged.connect(self.updatedelta)
+                self.cursors[0].scatter.sigPlotChanged.connect(self.updatedelta_sig)
                 self.cns[i] = True
 
         i = 10
         if not cn or i in cn:
             if self.cns[i] == False:
-                self.cursors[1].scatter.sigPlotChanged.connect(self.updatedelta)
+                self.cursors[1].scatter.sigPlotChanged.connect(self.updatedelta_sig)
                 self.cns[i] = True
 
         #----------------------------------------------------------------------#
@@ -1357,6 +2064,23 @@ class GUI_DisplayPanel(object):
 
         #----------------------------------------------------------------------#
 
+        # Signals when the Frames slider is moved
+        i = 66
+        if not cn or i in cn:
+            if self.cns[i] == False:
+                self.Frames.valueChanged.connect(self.select_frame_sig)
+                self.cns[i] = True
+
+        # Signals when the MainPlot range is changed (image resolution and window)
+        i = 67
+        if not cn or i in cn:
+            if self.cns[i] == False:
+                self.MainPlot.sigRangeChanged.connect(self.updateimage_sig)
+                self.MainPlot.getViewBox().sigResized.connect(self.updateimage_sig)
+                self.cns[i] = True
+
+        #----------------------------------------------------------------------#
+
         # Return the total number of signals
         if cn == [0]:
             return i
@@ -1447,7 +2171,7 @@ class GUI_DisplayPanel(object):
         i = 9
         if not cn or i in cn:
             try:
-                self.cursors[0].scatter.sigPlotChanged.disconnect(self.updatedelta)
+                self.cursors[0].scatter.sigPlotChanged.disconnect(self.updatedelta_sig)
             except:
                 print(i)
             finally: self.cns[i] = False
@@ -1455,7 +2179,7 @@ class GUI_DisplayPanel(object):
         i = 10
         if not cn or i in cn:
             try:
-                self.cursors[1].scatter.sigPlotChanged.disconnect(self.updatedelta)
+                self.cursors[1].scatter.sigPlotChanged.disconnect(self.updatedelta_sig)
             except:
                 print(i)
             finally: self.cns[i] = False
@@ -1956,37 +2680,92 @@ class GUI_DisplayPanel(object):
                 print(i)
             finally: self.cns[i] = False
 
+        #----------------------------------------------------------------------#
+
+        # Signals when the Frames slider is moved
+        i = 66
+        if not cn or i in cn:
+            try:
+                self.Frames.valueChanged.disconnect(self.select_frame_sig)
+            except:
+                print(i)
+            finally: self.cns[i] = False
+
+        # Signals when the MainPlot range is changed (image resolution and window)
+        i = 67
+        if not cn or i in cn:
+            try:
+                self.MainPlot.sigRangeChanged.disconnect(self.updateimage_sig)
+                self.MainPlot.getViewBox().sigResized.disconnect(self.updateimage_sig)
+            except:
+                print(i)
+            finally: self.cns[i] = False
+
     ############################################################################
 
     ### GUI internal methods (Display Panel functionalities)
 
-    # Find index of element in array closest to value
-    # (An elegant function used to map values into indexes with high efficiency)
-    def find_nearest(self,array,value):
+    # Request an update to the scheduler
+    # (The update runs in the next flush, see pyqt_ScheduleItem.py)
+    # (In profiling mode the time of the scheduled updates is recorded by name, see GUI_profile)
+    # (The wrapped updates are created once per scheduler key, such that the profiler adds little work to the cursor events)
+    def schedule(self,func,*args):
+        key=(func.__name__,)+args
+        if self.Profiler is None:
+            self.Schedule.schedule(key,partial(func,*args))
+        else:
+            wrapped=self.profiled.get(key)
+            if wrapped is None:
+                wrapped=self.profiled[key]=self.Profiler.wrap('flush '+func.__name__+''.join(' %s'%(a) for a in args),partial(func,*args))
+            self.Schedule.schedule(key,wrapped)
+
+    # Compute the data indexes of all the cursors at once (run before every flush of the scheduler)
+    # (See csr_index)
+    def index_all(self):
 
-        # Find the array length
-        n = len(array)
+        # Cursor positions
+        pos=np.array([item.data['pos'][0] for item in self.cursors])
 
-        l = 0      # Initialize lower index
-        u = n-1    # Initialize upper index
+        # Positions of the cursors and of their integration-crosshair boundaries
+        xs=pos[:,0:1]+np.array([0,-self.ispanx,self.ispanx])
+        ys=pos[:,1:2]+np.array([0,-self.ispany,self.ispany])
 
-        # Do while the difference between the upper limit and the lower limit is more than 1 unit
-        while u-l > 1:
+        # Map all the positions in a single call per axis
+        ix=self.xidx.index(xs)
+        iy=self.yidx.index(ys)
 
-            m = u+l >> 1 # Compute midpoint with a bitshift
+        # Sort the boundary indexes (they are swapped for descending axes)
+        ix[:,1:]=np.sort(ix[:,1:],axis=1)
+        iy[:,1:]=np.sort(iy[:,1:],axis=1)
 
-            if value >= array[m]:
-                l = m # Update the lower limit
-            else:
-                u = m # Update the upper limit
+        for i,(jx,jy) in enumerate(zip(ix.tolist(),iy.tolist())):
+            self.idx[i+1]=(jx[0],jy[0],jx[1],jx[2],jy[1],jy[2])
 
-        # Return index closest to value
-        if value == array[0]:
-            return 0
-        elif value == array[n-1]:
-            return n-1
-        else:
-            return l
+    # Clear the cursor indexes (run after every flush of the scheduler)
+    def clear_index(self):
+        self.idx={}
+
+    # Get the data indexes of a cursor
+    # [ix,iy] -> indexes of the cursor position
+    # [ax,bx,ay,by] -> indexes of the integration-crosshair boundaries
+    # (During a flush of the scheduler the indexes of all the cursors are already computed by index_all)
+    def csr_index(self,csr_num):
+
+        # Indexes computed at the start of the current flush (see index_all)
+        if csr_num in self.idx:
+            return self.idx[csr_num]
+
+        # Outside a flush the indexes are computed on demand and not stored (the cursor may move afterwards)
+        x=self.cursors[csr_num-1].data['pos'][0][0] # x position
+        y=self.cursors[csr_num-1].data['pos'][0][1] # y position
+
+        ix=self.xidx.index(x) # x index
+        iy=self.yidx.index(y) # y index
+
+        ax,bx=sorted((self.xidx.index(x-self.ispanx),self.xidx.index(x+self.ispanx))) # x boundary indexes
+        ay,by=sorted((self.yidx.index(y-self.ispany),self.yidx.index(y+self.ispany))) # y boundary indexes
+
+        return (ix,iy,ax,bx,ay,by)
 
     # Get default cursor position
     def dcp(self,rng,csr_num,i):
@@ -1998,8 +2777,8 @@ class GUI_DisplayPanel(object):
         x=self.dcp(self.rng0,csr_num,0) # x position
         y=self.dcp(self.rng0,csr_num,1) # y position
 
-        ix=self.find_nearest(self.x,x) # x index
-        iy=self.find_nearest(self.y,y) # y index
+        ix=self.xidx.index(x) # x index
+        iy=self.yidx.index(y) # y index
 
         # Set label text
         self.labels[csr_num-1].setText(self.format_csr % (ix, iy, self.xdim, x, self.ydim, y, self.zdim, self.z[ix,iy]))
@@ -2013,15 +2792,13 @@ class GUI_DisplayPanel(object):
         y1=self.dcp(self.rng0,1,1) # y position 1
         y2=self.dcp(self.rng0,2,1) # y position 2
 
-        ix1=self.find_nearest(self.x,x1) # x index 1
-        ix2=self.find_nearest(self.x,x2) # x index 2
-
-        iy1=self.find_nearest(self.y,y1) # y index 1
-        iy2=self.find_nearest(self.y,y2) # y index 2
+        ix1,ix2=self.xidx.index([x1,x2]).tolist() # x indexes 1 and 2
+        iy1,iy2=self.yidx.index([y1,y2]).tolist() # y indexes 1 and 2
 
         # Set labels text
         self.labels[4].setText(self.format_dxy % (self.xdim, x2-x1, self.ydim, y2-y1))
-        self.labels[5].setText(self.format_dzrc % (self.zdim, self.z[ix2,iy2]-self.z[ix1,iy1], ix2-ix1, iy2-iy1))
+        # (Converted to float, the difference of unsigned integer data (images) would wrap around)
+        self.labels[5].setText(self.format_dzrc % (self.zdim, float(self.z[ix2,iy2])-float(self.z[ix1,iy1]), ix2-ix1, iy2-iy1))
 
     # Update the positions of the side cursors
     def update_scsr(self,csr_num):
@@ -2034,8 +2811,7 @@ class GUI_DisplayPanel(object):
         x=self.cursors[csr_num-1].data['pos'][0][0] # x position
         y=self.cursors[csr_num-1].data['pos'][0][1] # y position
 
-        ix=self.find_nearest(self.x,x) # x index
-        iy=self.find_nearest(self.y,y) # y index
+        ix,iy=self.csr_index(csr_num)[0:2] # x and y indexes
 
         # Set label text
         self.labels[csr_num-1].setText(self.format_csr % (ix, iy, self.xdim, x, self.ydim, y, self.zdim, self.z[ix,iy]))
@@ -2049,67 +2825,91 @@ class GUI_DisplayPanel(object):
         y1=self.cursors[0].data['pos'][0][1] # y position 1
         y2=self.cursors[1].data['pos'][0][1] # y position 2
 
-        ix1=self.find_nearest(self.x,x1) # x index 1
-        ix2=self.find_nearest(self.x,x2) # x index 2
-
-        iy1=self.find_nearest(self.y,y1) # y index 1
-        iy2=self.find_nearest(self.y,y2) # y index 2
+        ix1,iy1=self.csr_index(1)[0:2] # x and y indexes 1
+        ix2,iy2=self.csr_index(2)[0:2] # x and y indexes 2
 
         # Set labels text
         self.labels[4].setText(self.format_dxy % (self.xdim, x2-x1, self.ydim, y2-y1))
-        self.labels[5].setText(self.format_dzrc % (self.zdim, self.z[ix2,iy2]-self.z[ix1,iy1], ix2-ix1, iy2-iy1))
+        # (Converted to float, the difference of unsigned integer data (images) would wrap around)
+        self.labels[5].setText(self.format_dzrc % (self.zdim, float(self.z[ix2,iy2])-float(self.z[ix1,iy1]), ix2-ix1, iy2-iy1))
 
     # Update the side MDC plots for a cursor
     def updateMDC(self,csr_num):
 
-        # Remove current MDC plot
-        self.MDCPlot.removeItem(self.MDCs[csr_num-1])
+        MDC=self.MDCs[csr_num-1]
+
+        # Skip pending updates of MDCs whose updates were disconnected after they were requested
+        # (See hideshowMDCs and integrateally)
+        if not self.cns[csr_num+10]:
+            return
+
+        ix,iy,ax,bx,ay,by=self.csr_index(csr_num)
+
+        # Show the MDC plot if it is not in MDCPlot
+        # (This happens when a hidden cursor is shown again)
+        if MDC.scene() is None:
+            self.MDCPlot.addItem(MDC)
 
         # If the y-integration is zero plot the MDC at the crosshair y-position
         if self.ispany == 0:
-            self.MDCs[csr_num-1]=self.MDCPlot.plot(self.x,self.z[:,self.find_nearest(self.y,self.cursors[csr_num-1].data['pos'][0][1])], pen=self.sidecs[csr_num-1])
+            MDC.setData(self.x,self.z[:,iy])
 
         # If the y-integration is non-zero perform the integration
         else:
 
-            # Calculate y-indexes of the integration-crosshair boundaries
-            a=self.find_nearest(self.y,self.cursors[csr_num-1].data['pos'][0][1]-self.ispany)
-            b=self.find_nearest(self.y,self.cursors[csr_num-1].data['pos'][0][1]+self.ispany)
-
-            # If the indexes are equal plot the MDC at the crosshair y-position
+            # If the y-indexes of the integration-crosshair boundaries are equal plot the MDC at the crosshair y-position
             # (This happens if the integration value is smaller than the length of one data pixel)
-            if a == b:
-                self.MDCs[csr_num-1]=self.MDCPlot.plot(self.x,self.z[:,self.find_nearest(self.y,self.cursors[csr_num-1].data['pos'][0][1])], pen=self.sidecs[csr_num-1])
+            if ay == by:
+                MDC.setData(self.x,self.z[:,iy])
 
             # If the indexes are not equal average the MDCs within the integration-crosshair
             else:
-                self.MDCs[csr_num-1]=self.MDCPlot.plot(self.x,np.sum(self.z[:,a:b+1],axis=1)/(b-a+1), pen=self.sidecs[csr_num-1])
+                MDC.setData(self.x,self.meany(ay,by,self.MDCbufs[csr_num-1]))
 
     # Update the side EDC plots for a cursor
     def updateEDC(self,csr_num):
 
-        # Remove current EDC plot
-        self.EDCPlot.removeItem(self.EDCs[csr_num-1])
+        EDC=self.EDCs[csr_num-1]
+
+        # Skip pending updates of EDCs whose updates were disconnected after they were requested
+        # (See hideshowEDCs and integrateallx)
+        if not self.cns[csr_num+14]:
+            return
+
+        ix,iy,ax,bx,ay,by=self.csr_index(csr_num)
+
+        # Show the EDC plot if it is not in EDCPlot
+        # (This happens when a hidden cursor is shown again)
+        if EDC.scene() is None:
+            self.EDCPlot.addItem(EDC)
 
         # If the x-integration is zero plot the EDC at the crosshair x-position
         if self.ispanx == 0:
-            self.EDCs[csr_num-1]=self.EDCPlot.plot(self.z[self.find_nearest(self.x,self.cursors[csr_num-1].data['pos'][0][0]),:],self.y, pen=self.sidecs[csr_num-1])
+            EDC.setData(self.z[ix,:],self.y)
 
         # If the x-integration is non-zero perform the integration
         else:
 
-            # Calculate x-indexes of the integration-crosshair boundaries
-            a=self.find_nearest(self.x,self.cursors[csr_num-1].data['pos'][0][0]-self.ispanx)
-            b=self.find_nearest(self.x,self.cursors[csr_num-1].data['pos'][0][0]+self.ispanx)
-
-            # If the indexes are equal plot the EDC at the crosshair x-position
+            # If the x-indexes of the integration-crosshair boundaries are equal plot the EDC at the crosshair x-position
             # (This happens if the integration value is smaller than the length of one data pixel)
-            if a == b:
-                self.EDCs[csr_num-1]=self.EDCPlot.plot(self.z[self.find_nearest(self.x,self.cursors[csr_num-1].data['pos'][0][0]),:],self.y, pen=self.sidecs[csr_num-1])
+            if ax == bx:
+                EDC.setData(self.z[ix,:],self.y)
 
             # If the indexes are not equal average the EDCs within the integration-crosshair
             else:
-                self.EDCs[csr_num-1]=self.EDCPlot.plot(np.sum(self.z[a:b+1,:],axis=0)/(b-a+1),self.y, pen=self.sidecs[csr_num-1])
+                EDC.setData(self.meanx(ax,bx,self.EDCbufs[csr_num-1]),self.y)
+
+    # Average of z over the x-indexes a..b (both included) using the prefix sums (EDC integration)
+    # If out is provided the result is written into it (no new array is allocated)
+    # NaN values are ignored (the average is NaN where all the values are NaN)
+    def meanx(self,a,b,out=None):
+        return self.zcx.mean(a,b,out)
+
+    # Average of z over the y-indexes a..b (both included) using the prefix sums (MDC integration)
+    # If out is provided the result is written into it (no new array is allocated)
+    # NaN values are ignored (the average is NaN where all the values are NaN)
+    def meany(self,a,b,out=None):
+        return self.zcy.mean(a,b,out)
 
     # "Cursors follow me" feature
     def follow_core(self,rng):
@@ -2256,19 +3056,19 @@ class GUI_DisplayPanel(object):
 
             # Move cursor data-row up
             if evt.key() == QtCore.Qt.Key_Up and self.cursors[csr_num-1].data['pos'][0][1] + self.ispany < self.y_max:
-                self.cursors[csr_num-1].setData(pos=np.array([[self.cursors[csr_num-1].data['pos'][0][0],self.y[self.find_nearest(self.y,self.cursors[csr_num-1].data['pos'][0][1])+1]]]), **self.dicts[csr_num-1])
+                self.cursors[csr_num-1].setData(pos=np.array([[self.cursors[csr_num-1].data['pos'][0][0],self.yidx.next(self.cursors[csr_num-1].data['pos'][0][1],+1)]]), **self.dicts[csr_num-1])
 
             # Move cursor data-row down
             if evt.key() == QtCore.Qt.Key_Down and self.cursors[csr_num-1].data['pos'][0][1] - self.ispany > self.y_min:
-                self.cursors[csr_num-1].setData(pos=np.array([[self.cursors[csr_num-1].data['pos'][0][0],self.y[self.find_nearest(self.y,self.cursors[csr_num-1].data['pos'][0][1])-1]]]), **self.dicts[csr_num-1])
+                self.cursors[csr_num-1].setData(pos=np.array([[self.cursors[csr_num-1].data['pos'][0][0],self.yidx.next(self.cursors[csr_num-1].data['pos'][0][1],-1)]]), **self.dicts[csr_num-1])
 
             # Move cursor data-column right
             if evt.key() == QtCore.Qt.Key_Right and self.cursors[csr_num-1].data['pos'][0][0] + self.ispanx < self.x_max:
-                self.cursors[csr_num-1].setData(pos=np.array([[self.x[self.find_nearest(self.x,self.cursors[csr_num-1].data['pos'][0][0])+1],self.cursors[csr_num-1].data['pos'][0][1]]]), **self.dicts[csr_num-1])
+                self.cursors[csr_num-1].setData(pos=np.array([[self.xidx.next(self.cursors[csr_num-1].data['pos'][0][0],+1),self.cursors[csr_num-1].data['pos'][0][1]]]), **self.dicts[csr_num-1])
 
             # Move cursor data-column left
             if evt.key() == QtCore.Qt.Key_Left and self.cursors[csr_num-1].data['pos'][0][0] - self.ispanx > self.x_min:
-                self.cursors[csr_num-1].setData(pos=np.array([[self.x[self.find_nearest(self.x,self.cursors[csr_num-1].data['pos'][0][0])-1],self.cursors[csr_num-1].data['pos'][0][1]]]), **self.dicts[csr_num-1])
+                self.cursors[csr_num-1].setData(pos=np.array([[self.xidx.next(self.cursors[csr_num-1].data['pos'][0][0],-1),self.cursors[csr_num-1].data['pos'][0][1]]]), **self.dicts[csr_num-1])
 
     # Cursor key pressed + arrow movements
     def karrowmove(self,csr_num,key,evt):
@@ -2456,9 +3256,12 @@ class GUI_DisplayPanel(object):
                 if csr_num > 2:
                     self.CursorStats.addItem(self.labels[csr_num-1],row=csr_num-1,col=0)
 
-                    # Clear the new PyQt5.QtWidgets.QGraphicsRectItem object from the scene() in self.CursorStats.ci
+                    # Clear the new PyQt5.QtWidgets.QGraphicsRectItem object from the scene() in self.CursorStats.ci:
+                    # These objects are created everytime a label is added in self.CursorStats and if they are not deleted
+                    # they keep accumulating everytime a cursor is shown
+                    # Their accumulation considerably reduces the performance of the Display Panel
                     # The new object is the first in self.CursorStats.items()
-                    # (See discussion in GUI_files)
+                    # (Use the method .items() to see the all the items in self.CursorStats)
                     self.CursorStats.ci.scene().removeItem(self.CursorStats.items()[0])
 
                 # Run immediate cursor follow function
@@ -2485,6 +3288,9 @@ class GUI_DisplayPanel(object):
                 # Connect MDC updates with the cursors
                 self.GUI_connect(cn)
 
+                # Refresh the MDC (the data may have changed while it was hidden)
+                self.updateMDC(csr_num)
+
     # Hide/show EDCs for a cursor
     def hideshowEDCs(self,cn,csr_num,key,evt):            #----> Non-trivial cns
 
@@ -2506,6 +3312,9 @@ class GUI_DisplayPanel(object):
                 # Connect EDC updates with the cursors
                 self.GUI_connect(cn)
 
+                # Refresh the EDC (the data may have changed while it was hidden)
+                self.updateEDC(csr_num)
+
     # Vertical cursors line up
     def lineupv(self,key,evt):
 
@@ -2814,7 +3623,7 @@ class GUI_DisplayPanel(object):
             self.DeltaX.setEnabled(False)
 
             # Plot the integrated EDC covering the whole x range
-            self.iX=self.EDCPlot.plot(np.sum(self.z[0:len(self.x),:],axis=0)/(len(self.x)),self.y, pen=self.peniEDC)
+            self.iX=self.EDCPlot.plot(self.meanx(0,self.x_size-1),self.y, pen=self.peniEDC)
 
             # Create a linear region covering the whole x range over MainPlot
             self.iregionX=pg.LinearRegionItem(values=(self.x_min,self.x_max),orientation='vertical',brush=self.brushiX,pen=self.peniX,movable=False)
@@ -2830,6 +3639,10 @@ class GUI_DisplayPanel(object):
             # Connect hide/show EDCs objects
             self.GUI_connect(cn)
 
+            # Refresh the restored EDCs (the data may have changed while they were hidden)
+            for i in self.tempEDC:
+                self.updateEDC(i+1)
+
             # Enable x integration-crosshairs
             self.SpanX.setValue(self.tempispanx)
             self.SpanX.setEnabled(True)
@@ -2866,7 +3679,7 @@ class GUI_DisplayPanel(object):
             self.DeltaY.setEnabled(False)
 
             # Plot the integrated MDC covering the whole y range
-            self.iY=self.MDCPlot.plot(self.x,np.sum(self.z[:,0:len(self.y)],axis=1)/(len(self.y)), pen=self.peniMDC)
+            self.iY=self.MDCPlot.plot(self.x,self.meany(0,self.y_size-1), pen=self.peniMDC)
 
             # Create a linear region covering the whole y range over MainPlot
             self.iregionY=pg.LinearRegionItem(values=(self.y_min,self.y_max),orientation='horizontal',brush=self.brushiY,pen=self.peniY,movable=False)
@@ -2882,6 +3695,10 @@ class GUI_DisplayPanel(object):
             # Connect hide/show MDCs objects
             self.GUI_connect(cn)
 
+            # Refresh the restored MDCs (the data may have changed while they were hidden)
+            for i in self.tempMDC:
+                self.updateMDC(i+1)
+
             # Enable y integration-crosshairs
             self.SpanY.setValue(self.tempispany)
             self.SpanY.setEnabled(True)
@@ -2892,54 +3709,42 @@ class GUI_DisplayPanel(object):
             self.MainPlot.removeItem(self.iregionY)
 
     # Set the levels in the image according to the positions of HCutOff and LCutOff
+    # (The slider values are percentiles or percentages of the z range, see self.contrastmode)
     def contrast(self):
-        self.Image.setLevels([(self.LCutOff.value()/100)*(self.z_max-self.z_min)+self.z_min,(self.HCutOff.value()/100)*(self.z_max-self.z_min)+self.z_min])
 
-    # Invert contrast sliders
-    def invert(self):
-
-        if self.Invert.isChecked():
-            self.HCutOff.setSliderPosition(0)
-            self.LCutOff.setSliderPosition(100)
+        # Percentiles (table lookup)
+        if self.contrastmode == 'quantile':
+            self.Image.setLevels([self.zq[self.LCutOff.value()],self.zq[self.HCutOff.value()]])
 
+        # Percentages of the z range
         else:
-            self.HCutOff.setSliderPosition(100)
-            self.LCutOff.setSliderPosition(0)
+            self.Image.setLevels([(self.LCutOff.value()/100)*(self.z_max-self.z_min)+self.z_min,(self.HCutOff.value()/100)*(self.z_max-self.z_min)+self.z_min])
+
+    # Invert colormap
+    # (The inverted lookup table is applied, the contrast sliders are not moved)
+    def invert(self):
+        self.cmap_select()
 
     # Select colormap from a menu
     def cmap_select(self):
 
-        # Retrieve selected colormap
-        self.colormap=self.get_mpl_colormap(self.Cmaps.currentText())
+        # Retrieve selected colormap (inverted if the Invert checkbox is checked)
+        self.colormap=self.Colormaps.get(self.Cmaps.currentText(),self.Invert.isChecked())
 
         # Apply selected colormap
         self.Image.setLookupTable(self.colormap)
 
-    # Retrieve colormap from matplotlib
-    def get_mpl_colormap(self,cmap):
-
-        # Get the colormap from matplotlib
-        colormap = cm.get_cmap(cmap)
-        colormap._init()
-
-        # Convert the matplotlib colormap from 0-1 to 0-255 for PyQt5
-        # Ignore the last 3 rows of the colormap._lut:
-        # colormap._lut has shape (N+3,4) where the first N rows are the RGBA color representations
-        # The last 3 rows deal with the treatment of out-of-range and masked values
-        # They need to be ignored to avoid the generation of artifacts possibly related to floating-point errors
-        lut = (colormap._lut*255)[1:-3][:]
-
-        return lut
-    
     # Convert 2D xarray to dictionary
-    def xarray2dict(self,A):
+    def xarray2dict(self,A,frame=0):
 
-        # If data is 2D
-        if len(A.dims) == 2:
+        # If data is 2D or N-dimensional
+        # N-dimensional data (N > 2) -> the last two dimensions are displayed and the leading dimensions are sliced in frames
+        # The frames are numbered by the flattened index of the leading dimensions
+        if len(A.dims) >= 2:
 
             # Extract (x,y,z) dimensions
-            xdim=A.dims[0]
-            ydim=A.dims[1]
+            xdim=A.dims[-2]
+            ydim=A.dims[-1]
 
             if 'zdim' in A.attrs.keys():
                 zdim=A.attrs['zdim']
@@ -2964,11 +3769,31 @@ class GUI_DisplayPanel(object):
             else:
                 zuts='counts'  
 
+            # Extract frame indexes along the leading dimensions
+            fshape=A.shape[:-2]
+            frames=int(np.prod(fshape))
+            fidx=np.unravel_index(frame,fshape)
+
+            # Describe the frame (leading dimension coordinates)
+            ftext=[]
+            for dim,i in zip(A.dims[:-2],fidx):
+                if dim in A.coords:
+                    units=A.coords[dim].attrs.get('units','')
+                    ftext.append(dim+'='+('%0.'+self.digits+'f')%(A.coords[dim].data[i])+(' '+units if units else ''))
+                else:
+                    ftext.append(dim+'=%i'%(i))
+            if frames > 1:
+                ftext=', '.join(ftext)+' [%i/%i]'%(frame+1,frames)
+            else:
+                ftext=''
+
             # Extract data
+            # (Basic indexing of the leading dimensions returns a view of the frame, the data is not copied)
+            # (Lazy data, like the H5ArrayItem of load_i05HR_data, reads only the frame from disk)
             x=A.coords[xdim].data
             y=A.coords[ydim].data
-            z=A.data
+            z=A.data[fidx]
 
-        return  {'x':x,'y':y,'z':z,'xdim':xdim,'ydim':ydim,'zdim':zdim,'xuts':xuts,'yuts':yuts,'zuts':zuts}
+        return  {'x':x,'y':y,'z':z,'xdim':xdim,'ydim':ydim,'zdim':zdim,'xuts':xuts,'yuts':yuts,'zuts':zuts,'frame':frame,'frames':frames,'ftext':ftext}
 
 ################################################################################
\ No newline at end of file
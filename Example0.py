@@ -1,11 +1,10 @@
 # Load file import requirements
 from data_converters.i05HR_to_xarray import load_i05HR_data
+from data_converters.batch2xarray import batch2xarray
 from Run_DP import Run_DP
 
-# Load files
-a = load_i05HR_data('Example0/i05-126294.nxs')
-b = load_i05HR_data('Example0/i05-126295.nxs')
-c = load_i05HR_data('Example0/i05-126305.nxs')
-d = load_i05HR_data('Example0/i05-126306.nxs')
-
-Run_DP([a,b,c,d])
\ No newline at end of file
+# Load the files in parallel processes (they are listed at once and become available as they are converted)
+# (The processes need the __main__ guard on Windows and macOS)
+if __name__ == "__main__":
+    files = batch2xarray(load_i05HR_data, 'Example0/*.nxs')
+    Run_DP(files)
\ No newline at end of file
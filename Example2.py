@@ -1,9 +1,10 @@
 # Load file import requirements
 from data_converters.image2xarray import image2xarray
+from data_converters.lazy2xarray import lazy2xarray
 from Run_DP import Run_DP
 
-# Load Nd3Ni2O7 resPES datasets
-a = image2xarray('Example2/DTC-C_RT_1.png','x','y','z','pix','pix','bytes')
-b = image2xarray('Example2/DTC-C_4K_2.png','x','y','z','pix','pix','bytes')
+# List FIB images (they are loaded when they are selected in the Display Panel)
+a = lazy2xarray(image2xarray,'Example2/DTC-C_RT_1.png','x','y','z','pix','pix','bytes',name='Example2/DTC-C_RT_1.png')
+b = lazy2xarray(image2xarray,'Example2/DTC-C_4K_2.png','x','y','z','pix','pix','bytes',name='Example2/DTC-C_4K_2.png')
 
 Run_DP([a,b])
\ No newline at end of file
@@ -1,11 +1,20 @@
 # Run Display Panel
 # Edgar Abarca Morales
+import time
+t0 = time.perf_counter() # Startup reference time (before the imports)
 from PyQt5 import QtWidgets
 from pyqt_items.pyqt_WindowItem import WindowItem
 from DP import GUI_DisplayPanel
 import sys
 
-def Run_DP(files):
+# Startup profile (seconds since t0):
+# 'imports' -> Display Panel modules imported
+# 'window' -> Display Panel window shown
+# 'data' -> first file displayed
+# (profile=True prints it, it is also stored in DP.startup)
+def Run_DP(files, profile=False):
+
+    startup = {'imports': time.perf_counter()-t0}
 
     # Create a new app
     app = QtWidgets.QApplication(sys.argv)
@@ -13,12 +22,26 @@ def Run_DP(files):
     # Create a Display Panel in a WindowItem
     # (See pyqt_WindowItem.py)
     DP = GUI_DisplayPanel(WindowItem())
+    DP.startup = startup
 
-    # Show the Display Panel
+    # Show the Display Panel in a loading state
+    # (The window is painted before the first file is converted)
     DP.DisplayPanel.show()
+    DP.statusbar.showMessage('Loading...')
+    app.processEvents()
+    startup['window'] = time.perf_counter()-t0
+
+    # Record the startup time when the first file is displayed
+    def firstshown():
+        startup['data'] = time.perf_counter()-t0
+        if profile:
+            print('Startup (s): '+', '.join('%s=%.3f' % (key, value) for key, value in startup.items()))
+
+    DP.firstshown = firstshown
 
     # Retrieve input files
+    # (They are loaded in the background while the main loop runs, the window stays responsive until the first file is displayed)
     DP.GUI_files(files)
 
     # Run the app main loop
-    sys.exit(app.exec_())
+    sys.exit(app.exec_())
\ No newline at end of file
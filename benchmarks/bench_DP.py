@@ -0,0 +1,358 @@
+# Benchmarks for the Display Panel
+# Time the Display Panel hot paths on synthetic data using the Qt offscreen platform
+# The results are written as JSON, such that they can be compared across commits
+
+# Usage (from the Display Panel directory):
+# python benchmarks/bench_DP.py --nx 2000 --ny 1000 --files 4 --repeat 50 --out results.json
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import platform
+
+# Qt offscreen platform (no display needed)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Display Panel directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import xarray as xr
+import pyqtgraph as pg
+from PyQt5 import QtCore, QtWidgets
+
+from pyqt_items.pyqt_WindowItem import WindowItem
+from DP import GUI_DisplayPanel
+
+################################################################################
+
+# Synthetic data
+
+# Synthetic ARPES-like dataset: a few dispersing bands with noise and hot pixels
+def synthetic(nx, ny, seed=0, name='synthetic'):
+
+    rng = np.random.default_rng(seed)
+
+    x = np.linspace(-15, 15, nx)
+    y = np.linspace(80, 100, ny)
+
+    X, Y = np.meshgrid(x, y, indexing='ij')
+    z = np.zeros((nx, ny))
+    for k in range(3):
+        z += np.exp(-((Y-95+k*3)-0.02*(X-k)**2)**2/0.1)
+    z = 100*z+rng.poisson(5, (nx, ny))
+
+    # Hot pixels
+    z.flat[rng.integers(0, nx*ny, max(1, nx*ny//10000))] = 1e4
+
+    A = xr.DataArray(z, dims=('theta_par', 'eV'), coords={'theta_par': x, 'eV': y})
+    A.coords['theta_par'].attrs = {'units': 'deg'}
+    A.coords['eV'].attrs = {'units': 'eV'}
+    A.attrs['scan_name'] = name
+
+    return A
+
+################################################################################
+
+# Fake mouse events (the attributes used by CursorItem and ZoomItem)
+
+class DragEvent:
+
+    def __init__(self, start, pos, down, finish=False):
+        self.start = start
+        self.finish = finish
+        self.p = pg.Point(*pos)
+        self.down = pg.Point(*down)
+
+    def button(self):
+        return QtCore.Qt.LeftButton
+
+    def isStart(self):
+        return self.start
+
+    def isFinish(self):
+        return self.finish
+
+    def buttonDownPos(self):
+        return self.down
+
+    def pos(self):
+        return self.p
+
+    def accept(self):
+        pass
+
+    def ignore(self):
+        pass
+
+class ClickEvent:
+
+    def __init__(self, scenepos, double):
+        self.scenepos = scenepos
+        self.dbl = double
+
+    def button(self):
+        return QtCore.Qt.LeftButton
+
+    def double(self):
+        return self.dbl
+
+    def scenePos(self):
+        return self.scenepos
+
+    def accept(self):
+        pass
+
+    def ignore(self):
+        pass
+
+################################################################################
+
+# Timing helpers
+
+# Statistics of a list of times (ms)
+def stats(times):
+    t = np.array(times)*1000
+    return {'n': len(t), 'median_ms': float(np.median(t)), 'mean_ms': float(np.mean(t)), 'min_ms': float(np.min(t)), 'max_ms': float(np.max(t))}
+
+# Process the pending Qt events (paint included)
+def process(app):
+    app.processEvents()
+
+################################################################################
+
+# Benchmarks
+
+# Create a Display Panel and load the files (time to the first displayed file)
+def bench_startup(app, files, repeat):
+
+    times = []
+    for i in range(repeat):
+        t = time.perf_counter()
+        DP = GUI_DisplayPanel(WindowItem())
+        DP.DisplayPanel.show()
+        DP.GUI_files(files)
+        DP.wait_loaded()
+        process(app)
+        times.append(time.perf_counter()-t)
+        DP.DisplayPanel.close()
+        DP.DisplayPanel.deleteLater()
+        process(app)
+
+    return stats(times)
+
+# Switch between files until the selected file is displayed (cold: prepared files cache cleared and no prefetching, warm: cached)
+def bench_select_file(app, DP, repeat):
+
+    n = DP.Files.count()
+    result = {}
+
+    prefetchrange = DP.prefetchrange
+    DP.prefetchrange = 0
+
+    times = []
+    for i in range(repeat):
+        DP.Prepared.clear()
+        t = time.perf_counter()
+        DP.Files.setCurrentRow((DP.Files.currentRow()+1) % n)
+        DP.wait_loaded()
+        process(app)
+        times.append(time.perf_counter()-t)
+    result['cold'] = stats(times)
+
+    # Fill the cache
+    for i in range(n):
+        DP.Files.setCurrentRow(i)
+        DP.wait_loaded()
+    process(app)
+
+    times = []
+    for i in range(repeat):
+        t = time.perf_counter()
+        DP.Files.setCurrentRow((DP.Files.currentRow()+1) % n)
+        DP.wait_loaded()
+        process(app)
+        times.append(time.perf_counter()-t)
+    result['warm'] = stats(times)
+
+    DP.prefetchrange = prefetchrange
+    DP.Files.setCurrentRow(0)
+    DP.wait_loaded()
+    process(app)
+
+    return result
+
+# Drag cursor 1 through CursorItem.mouseDragEvent
+# event -> drag event handling only (the dependent updates are coalesced by the scheduler)
+# frame -> drag event followed by a flush of the scheduler (cost of one displayed frame)
+def bench_drag(app, DP, repeat):
+
+    csr = DP.cursors[0]
+    dx = (DP.x_max-DP.x_min)/(8*repeat)
+    dy = (DP.y_max-DP.y_min)/(8*repeat)
+
+    result = {}
+    for name, flush in (('event', False), ('frame', True)):
+
+        # Start the drag at the current cursor position
+        x0, y0 = csr.data['pos'][0]
+        csr.mouseDragEvent(DragEvent(True, (x0, y0), (x0, y0)))
+
+        times = []
+        for i in range(repeat):
+            ev = DragEvent(False, (x0+i*dx, y0+i*dy), (x0, y0))
+            t = time.perf_counter()
+            csr.mouseDragEvent(ev)
+            if flush:
+                DP.Schedule.flush()
+            times.append(time.perf_counter()-t)
+
+        csr.mouseDragEvent(DragEvent(False, (x0, y0), (x0, y0), finish=True))
+        DP.Schedule.flush()
+        result[name] = stats(times)
+
+    process(app)
+
+    return result
+
+# Update the side plots of cursor 1 with several integration spans (fractions of the data range)
+def bench_sides(app, DP, repeat):
+
+    result = {}
+    DimorPix = DP.DimorPix.isChecked()
+    DP.DimorPix.setChecked(False)
+
+    for f in (0, 0.01, 0.1, 0.5):
+
+        DP.SpanX.setValue(f*(DP.x_max-DP.x_min))
+        DP.SpanY.setValue(f*(DP.y_max-DP.y_min))
+        DP.Schedule.flush()
+
+        for name, func in (('updateMDC', DP.updateMDC), ('updateEDC', DP.updateEDC)):
+            times = []
+            for i in range(repeat):
+                t = time.perf_counter()
+                func(1)
+                times.append(time.perf_counter()-t)
+            result[name+'_span%g' % (f)] = stats(times)
+
+    DP.SpanX.setValue(0)
+    DP.SpanY.setValue(0)
+    DP.DimorPix.setChecked(DimorPix)
+    DP.Schedule.flush()
+    process(app)
+
+    return result
+
+# Sweep the contrast sliders (including the repaint of MainPlot)
+def bench_contrast(app, DP, repeat):
+
+    times = []
+    for i in range(repeat):
+        v = 50+int(50*np.sin(i))
+        t = time.perf_counter()
+        DP.HCutOff.setValue(max(v, 1))
+        DP.LCutOff.setValue(min(100-v, 99))
+        process(app)
+        times.append(time.perf_counter()-t)
+
+    DP.HCutOff.setValue(100)
+    DP.LCutOff.setValue(0)
+    process(app)
+
+    return stats(times)
+
+# Zoom with the ZoomItem double-click box and reset the view
+def bench_zoom(app, DP, repeat):
+
+    vb = DP.MainPlot.getViewBox()
+    scene = vb.scene()
+
+    times = []
+    for i in range(repeat):
+
+        # Zoom box from the center to a corner of a fraction of the data
+        f = 0.05+0.4*(i % 5)/5
+        cx, cy = (DP.x_min+DP.x_max)/2, (DP.y_min+DP.y_max)/2
+        p1 = vb.mapViewToScene(QtCore.QPointF(cx, cy))
+        p2 = vb.mapViewToScene(QtCore.QPointF(cx+f*(DP.x_max-DP.x_min)/2, cy+f*(DP.y_max-DP.y_min)/2))
+
+        t = time.perf_counter()
+        DP.ZoomMain.mouseDoubleClickEvent(ClickEvent(p1, True))
+        scene.sigMouseMoved.emit(p2)
+        scene.sigMouseClicked.emit(ClickEvent(p2, False))
+        DP.Schedule.flush()
+        process(app)
+        times.append(time.perf_counter()-t)
+
+        # Reset the view
+        vb.setRange(xRange=(DP.le, DP.re), yRange=(DP.be, DP.te), padding=0)
+        DP.Schedule.flush()
+        process(app)
+
+    return stats(times)
+
+################################################################################
+
+# Git commit of the Display Panel (if available)
+def commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Display Panel benchmarks')
+    parser.add_argument('--nx', type=int, default=1000, help='x size of the synthetic data')
+    parser.add_argument('--ny', type=int, default=1000, help='y size of the synthetic data')
+    parser.add_argument('--files', type=int, default=4, help='number of synthetic files')
+    parser.add_argument('--repeat', type=int, default=30, help='repetitions of each benchmark')
+    parser.add_argument('--out', default=None, help='JSON output file (default: stdout)')
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+
+    files = [synthetic(args.nx, args.ny, seed=i, name='synthetic%i' % (i)) for i in range(args.files)]
+
+    results = {}
+    results['startup'] = bench_startup(app, files, max(1, args.repeat//10))
+
+    DP = GUI_DisplayPanel(WindowItem())
+    DP.DisplayPanel.show()
+    DP.GUI_files(files)
+    DP.wait_loaded()
+    process(app)
+
+    results['select_file'] = bench_select_file(app, DP, args.repeat)
+    results['drag'] = bench_drag(app, DP, args.repeat)
+    results['sides'] = bench_sides(app, DP, args.repeat)
+    results['contrast'] = bench_contrast(app, DP, args.repeat)
+    results['zoom'] = bench_zoom(app, DP, max(1, args.repeat//3))
+
+    output = {
+        'meta': {
+            'commit': commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pyqtgraph': pg.__version__,
+            'platform': QtWidgets.QApplication.platformName(),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+
+    text = json.dumps(output, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Batch loading of input files for the Display Panel
+# The files are converted in parallel processes (HDF5 decompression and text parsing are CPU-bound)
+# The batch lists the files in the requested order, each file is available as soon as its conversion is done
+
+import os
+import glob
+import weakref
+import threading
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+
+import numpy as np
+
+# Input file converted in a process of a batch
+# Same use as a lazy input file (see lazy2xarray.py): attrs['scan_name'] lists it and load() returns the DataArray
+# The converted DataArray is released by the batch once it is loaded: it stays in memory only while it is used
+# (for example in the cache of loaded files of the Display Panel), afterwards the file is converted again when it is loaded
+class BatchFile:
+
+    def __init__(self, future, path, name, converter, read, kwargs):
+
+        self.future = future
+        self.path = path
+
+        # Conversion of the file when it is loaded again
+        self.converter = converter
+        self.read = read
+        self.kwargs = kwargs
+
+        # Weak reference to the last loaded DataArray (it is reused as long as it is in memory)
+        self.ref = None
+        self.lock = threading.Lock()
+
+        self.attrs = {'scan_name': name}
+
+    # The conversion is done (successfully or not)
+    def done(self):
+        return self.future is None or self.future.done()
+
+    # Exception raised by the conversion (None if it is not done or it succeeded, CancelledError if it was cancelled)
+    def error(self):
+        if self.future is None or not self.future.done():
+            return None
+        if self.future.cancelled():
+            return CancelledError()
+        return self.future.exception()
+
+    # Call func(self) when the conversion is done
+    # (func is run in a thread of the process pool, or immediately if the conversion is already done)
+    def notify(self, func):
+        if self.future is None:
+            func(self)
+        else:
+            self.future.add_done_callback(lambda future: func(self))
+
+    # Wait for the conversion and return the DataArray
+    # (The exception of a failed conversion is raised here, the other files of the batch are not affected)
+    # The first load takes the DataArray from the process (the batch does not keep it)
+    # Later loads return the same DataArray if it is still in memory, otherwise the file is converted again in this process
+    def load(self):
+
+        with self.lock:
+
+            if self.future is not None:
+                A = self.future.result()
+                self.future = None
+
+            else:
+                A = self.ref() if self.ref is not None else None
+                if A is None:
+                    A = convert(self.converter, self.path, self.read, self.kwargs)
+
+            self.ref = weakref.ref(A)
+
+            return A
+
+# Convert a file in a process of the pool
+# read=True -> the data is read into memory in the process (lazy data, like the H5ArrayItem of load_i05HR_data, is read there)
+def convert(converter, path, read, kwargs):
+
+    A = converter(path, **kwargs)
+
+    if read and not isinstance(A.data, np.ndarray):
+        A = A.copy(data=np.asarray(A.data))
+
+    return A
+
+# Create a batch of input files
+# converter -> function that returns a DataArray from a path (for example load_i05HR_data, txt2xarray or image2xarray)
+# (It must be defined at module level, such that it can be sent to the processes)
+# files -> list of paths, or a glob pattern (for example 'Example0/*.nxs', sorted by name)
+# workers -> number of processes (default: number of CPUs)
+# read -> read the data into memory in the processes (False -> lazy data, e.g. load_i05HR_data with lazy=True, is kept lazy and read in the Display Panel)
+# **kwargs -> keyword arguments of the converter
+# Returns the list of BatchFiles in the order of files (name -> path without directory and extension)
+def batch2xarray(converter, files, workers=None, read=True, **kwargs):
+
+    if isinstance(files, str):
+        files = sorted(glob.glob(files))
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+
+    batch = []
+    for path in files:
+        name = os.path.splitext(os.path.basename(str(path)))[0]
+        batch.append(BatchFile(pool.submit(convert, converter, path, read, kwargs), path, name, converter, read, kwargs))
+
+    # The processes exit when the submitted conversions are done
+    pool.shutdown(wait=False)
+
+    return batch
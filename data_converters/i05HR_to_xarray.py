@@ -3,20 +3,29 @@
 #Brendan Edwards 09/02/2021
 
 import numpy as np
-import xarray as xr
-import nexusformat.nexus as nf
+from numpy_items.numpy_H5ArrayItem import H5ArrayItem
 
-def load_i05HR_data(file, **kwargs):
+#xarray and nexusformat are imported when a file is loaded (they are slow to import and not needed to start the Display Panel)
+
+def load_i05HR_data(file, lazy=False, **kwargs):
     '''This function loads ARPES data from I05-HR beamline
     
     Input:
         file - Path to the file to be loaded (string)
-        **kwargs - Additional slicing options for partial loading of data or for binning on load (strings)
+        lazy - Read the detector data from disk only when it is indexed, e.g. one frame of a map at a time (bool, default False)
+               The data of a lazy DataArray is an H5ArrayItem: it is meant for the Display Panel, use lazy=False for analysis (arithmetic, .values)
+        **kwargs - Additional slicing options for partial loading of data or for binning on load:
+            <dim>=(start, stop) - keep the values of the co-ordinate dim between start and stop, e.g. eV=(95.5, 96.2) (tuple of floats)
+            bin_<dim>=n - average every n values along dim, e.g. bin_theta_par=2 (int)
+            Only the selected part of the file is read
     
     Returns:
         data - DataArray or DataSet with loaded data (xarray)'''
 
-    #open the file (read only)
+    import xarray as xr
+    import nexusformat.nexus as nf
+
+    #open the file (read only), the same file tree is used to read the metadata
     f = nf.nxload(file, 'r')
     
     #check scan is from Diamond I05-HR
@@ -27,7 +36,8 @@ def load_i05HR_data(file, **kwargs):
     analyser_keys = list(f['entry1/analyser/'].keys())
 
     #read some core data from file
-    spectrum = f.entry1.instrument.analyser.data.nxvalue #the actual (cube) of measured spectra
+    #(the detector data is read through its own h5py handle: nexusformat closes the handle of the file tree after every access, so it cannot be shared)
+    spectrum = H5ArrayItem(file, '/entry1/instrument/analyser/data') #the actual (cube) of measured spectra, kept on disk (memory-mapped or read through a chunk cache of one detector frame)
     theta = f.entry1.instrument.analyser.angles.nxvalue #the analyser angle scale readout
 
     #determine type of scan from heirarchy of driven/secondary axes and load data accordingly
@@ -111,33 +121,138 @@ def load_i05HR_data(file, **kwargs):
                 #check data format looks right for a single dispersion
                 if len(spectrum.shape) == 3 and spectrum.shape[0] == 1:
                     #data array
-                    data = xr.DataArray(spectrum[0], dims=("theta_par","eV"), coords={"theta_par": theta, "eV": KE_values})
+                    data = xr.DataArray(spectrum.select(0), dims=("theta_par","eV"), coords={"theta_par": theta, "eV": KE_values})
                     data.coords['theta_par'].attrs = {'units' : 'deg'}
                     scan_type = "dispersion"
                 
                 else:
                     raise Exception("Scan type does not seem to be supported.")
     
+    #slice and bin the data on load (only the selected part of the file is read)
+    data = slice_bin(data, kwargs)
+    
+    #read the data into memory
+    if not lazy:
+        data = data.copy(data=np.asarray(data.data))
+    
     #get and attach metadata
-    meta_list = get_i05HR_metadata(file, scan_type)
+    meta_list = get_i05HR_metadata(f, scan_type)
     for i in meta_list:
         data.attrs[i] = meta_list[i]
     data.name = meta_list['scan_name']
     return data
 
+def slice_bin(data, kwargs):
+    '''This function selects a co-ordinate range and bins the dimensions of a DataArray backed by an H5ArrayItem, without reading the file
+    
+    Input:
+        data - Loaded data (xarray)
+        kwargs - Slicing options <dim>=(start, stop) and binning options bin_<dim>=n (dictionary)
+    
+    Returns:
+        data - Sliced and binned data (xarray)'''
+
+    import xarray as xr
+
+    kwargs = dict(kwargs)
+    key = []
+    bins = []
+    coords = {}
+    for dim in data.dims:
+        values = data.coords[dim].data
+        
+        #co-ordinate range (either order, inclusive)
+        if dim in kwargs:
+            start, stop = sorted(kwargs.pop(dim))
+            i = np.nonzero((values >= start) & (values <= stop))[0]
+            if len(i) == 0:
+                raise Exception("No "+dim+" values between "+str(start)+" and "+str(stop)+".")
+            key.append(slice(i[0], i[-1]+1))
+        else:
+            key.append(slice(None))
+        values = values[key[-1]]
+        
+        #binning (the co-ordinates are averaged as the data)
+        n = int(kwargs.pop('bin_'+dim, 1))
+        if n < 1 or n > len(values):
+            raise Exception("Binning of "+dim+" must be between 1 and "+str(len(values))+".")
+        bins.append(n)
+        values = values[:len(values)//n*n].reshape(-1, n).mean(axis=1)
+        
+        coords[dim] = (dim, values, data.coords[dim].attrs)
+    
+    if kwargs:
+        raise Exception("Unknown slicing options: "+', '.join(kwargs)+".")
+    
+    #nothing to select
+    if all(k == slice(None) for k in key) and all(n == 1 for n in bins):
+        return data
+    
+    return xr.DataArray(data.data.select(tuple(key), bins), dims=data.dims, coords=coords, attrs=data.attrs)
+
+def get_i05HR_header(file):
+    '''This function reads the scan name, scan type and data shape of a Nexus file otained at the Diamond i05 HR branch, without parsing the file tree (fast, e.g. to check the scan type and the data size of a file before loading it)
+    
+    Input:
+        file - Path to the file (string)
+        
+    Returns:
+        header - Scan name, scan type (None if not supported) and shape of the detector data (dictionary)
+    '''
+
+    import h5py
+
+    with h5py.File(file, 'r') as h:
+        analyser_keys = list(h['entry1/analyser'].keys())
+        shape = h['entry1/instrument/analyser/data'].shape
+        scan_name = h['entry1/entry_identifier'][()]
+    
+    #the identifier can be stored as a string or as an array of one string
+    if isinstance(scan_name, np.ndarray):
+        scan_name = scan_name.flat[0]
+    if isinstance(scan_name, bytes):
+        scan_name = scan_name.decode()
+    
+    #type of scan, in the same order as in load_i05HR_data
+    if 'energy' in analyser_keys:
+        scan_type = "hv scan"
+    elif 'sapolar' in analyser_keys:
+        scan_type = "FS map"
+    elif 'salong' in analyser_keys:
+        scan_type = "focus scan"
+    elif 'saz' in analyser_keys and 'sax' in analyser_keys:
+        scan_type = "spatial map"
+    elif 'saz' in analyser_keys or 'sax' in analyser_keys:
+        scan_type = "line scan"
+    elif 'say' in analyser_keys:
+        scan_type = "focus scan"
+    elif 'temperature' in analyser_keys:
+        scan_type = "temp dep"
+    elif len(shape) == 3 and shape[0] == 1:
+        scan_type = "dispersion"
+    else:
+        scan_type = None
+    
+    return {'scan_name': 'i05-'+str(scan_name), 'scan_type': scan_type, 'shape': shape}
+
 def get_i05HR_metadata(file,scan_type):
     '''This function will extract the relevant metadata from the data tree of a Nexus file otained at the Diamond i05 HR branch.
     
     Input:
-        file - Path to the file being loaded (string)
+        file - Path to the file being loaded (string), or its file tree already loaded with nxload (NXroot)
         scan_type - The type of scan, e.g. FS map (string)
         
     Retuns:
         meta_list - List of relevant metadata (dictionary)
     '''
+
+    import nexusformat.nexus as nf
     
-    #load the file tree of the data
-    a=nf.nxload(file)
+    #load the file tree of the data (unless it is already loaded)
+    if isinstance(file, nf.NXroot):
+        a=file
+    else:
+        a=nf.nxload(file, 'r')
 
     #assign metadata
     meta_list = {}
@@ -2,19 +2,42 @@
 # Edgar Abarca Morales
 
 # Load file import requirements
-from PIL import Image
+# (PIL and xarray are imported when a file is converted, to keep the Display Panel startup fast)
 import numpy as np
-import xarray as xr
+
+# Greyscale image modes kept with their native data type (other images are converted to 8-bit greyscale)
+MODES = {'L': np.uint8, 'I;16': np.dtype('<u2'), 'I;16L': np.dtype('<u2'), 'I;16B': np.dtype('>u2')}
 
 # Create a Display Panel input dictionary from image
-def image2xarray(filename, xdim, ydim, zdim, xuts, yuts, zuts):
+# rotate -> rotation angle of the image in degrees (0 -> no rotation)
+# invert -> invert the intensities (maximum of the data type minus the image, dark features become bright)
+# The pixels are kept in their native data type (uint8 or uint16) and the flip and transposition of the axes are views
+# Uncompressed TIFFs without rotation are read strip by strip into a single array and inverted in place (one copy of the pixels)
+def image2xarray(filename, xdim, ydim, zdim, xuts, yuts, zuts, rotate=-0.5, invert=True):
+
+    from PIL import Image
+    import xarray as xr
 
     # Process image
-    I = Image.open(filename).convert('L')
-    I = I.rotate(-0.5)
+    I = Image.open(filename)
+    if I.mode not in MODES:
+        I = I.convert('L')
 
     # Extract data
-    z=255-np.flip(np.array(I).astype(int),axis=0)
+    # (The array of a PIL image is read-only, it is replaced by the inverted array)
+    z=None if rotate else read_strips(I)
+    if z is None:
+        if rotate:
+            I = I.rotate(rotate)
+        z=np.asarray(I)
+    del I
+
+    if invert and z.flags.writeable:
+        np.subtract(np.iinfo(z.dtype).max,z,out=z)
+    elif invert:
+        z=np.iinfo(z.dtype).max-z
+
+    z=z[::-1]
     y=np.arange(0,np.shape(z)[0])
     x=np.arange(0,np.shape(z)[1])
 
@@ -25,4 +48,37 @@ def image2xarray(filename, xdim, ydim, zdim, xuts, yuts, zuts):
     A.attrs['zdim'] = zdim
     A.attrs['zuts'] = zuts
 
-    return A
\ No newline at end of file
+    return A
+
+# Read the pixels of an uncompressed greyscale TIFF strip by strip into a single array (native byte order)
+# The strips are read from the file directly into the array, PIL does not decode the image
+# Returns None for other images (they are decoded by PIL)
+def read_strips(I):
+
+    w, h = I.size
+    tiles = getattr(I, 'tile', None) or []
+
+    if I.format != 'TIFF' or not tiles:
+        return None
+
+    for t in tiles:
+        if t[0] != 'raw' or t[3][0] != I.mode or t[3][1:] not in ((0, 1), (w*np.dtype(MODES[I.mode]).itemsize, 1)):
+            return None
+        if t[1][0] != 0 or t[1][2] != w:
+            return None
+
+    dtype = np.dtype(MODES[I.mode])
+    z = np.empty((h, w), dtype.newbyteorder('='))
+
+    with open(I.filename, 'rb') as f:
+        for t in tiles:
+            y0, y1 = t[1][1], t[1][3]
+            f.seek(t[2])
+            if f.readinto(z[y0:y1]) != z[y0:y1].nbytes:
+                return None
+
+    # Big-endian data -> swap the bytes in place
+    if not dtype.isnative:
+        z.byteswap(inplace=True)
+
+    return z
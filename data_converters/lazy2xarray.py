@@ -0,0 +1,33 @@
+# Lazy input file for the Display Panel
+# The converter of a file is run only when the file is selected (or prefetched) in the Display Panel
+
+import os
+
+# Input file that is converted to xarray on demand
+# Only its name is needed to list it in the Display Panel (attrs['scan_name'], like a DataArray)
+class LazyFile:
+
+    def __init__(self, converter, args, kwargs, name):
+
+        self.converter = converter
+        self.args = args
+        self.kwargs = kwargs
+
+        self.attrs = {'scan_name': name}
+
+    # Run the converter and return the DataArray
+    # (The DataArray is not stored: the Display Panel keeps the most recently used files in its own cache)
+    # (Same method name as DataArray.load(), which returns the DataArray itself)
+    def load(self):
+        return self.converter(*self.args, **self.kwargs)
+
+# Create a lazy input file
+# converter -> function that returns a DataArray (for example load_i05HR_data, txt2xarray or image2xarray)
+# *args, **kwargs -> arguments of the converter
+# name -> name in the Display Panel file list (default: first argument without directory and extension)
+def lazy2xarray(converter, *args, name=None, **kwargs):
+
+    if name is None:
+        name = os.path.splitext(os.path.basename(str(args[0])))[0]
+
+    return LazyFile(converter, args, kwargs, name)
@@ -2,14 +2,19 @@
 # Edgar Abarca Morales
 
 # Load file import requirements
+# (xarray is imported when a file is converted, to keep the Display Panel startup fast)
+import os
+import glob
 import numpy as np
-import xarray as xr
 
-def txt2xarray(filename, x_file, y_file, z_file, xdim, ydim, zdim, xuts, yuts, zuts):
+# cache=True -> the parsed text files are stored in binary sidecar files (see read_txt), reopening them is a memory map instead of a parse
+def txt2xarray(filename, x_file, y_file, z_file, xdim, ydim, zdim, xuts, yuts, zuts, cache=True):
 
-    x = np.genfromtxt(x_file,delimiter=',')
-    y = np.genfromtxt(y_file,delimiter=',')
-    z = np.genfromtxt(z_file,delimiter=',')
+    import xarray as xr
+
+    x = read_txt(x_file,cache)
+    y = read_txt(y_file,cache)
+    z = read_txt(z_file,cache)
 
     A = xr.DataArray(np.transpose(z), dims=(xdim,ydim), coords={xdim:x,ydim:y})
     A.coords[xdim].attrs = {'units' : xuts}
@@ -18,4 +23,48 @@ def txt2xarray(filename, x_file, y_file, z_file, xdim, ydim, zdim, xuts, yuts, z
     A.attrs['zdim'] = zdim
     A.attrs['zuts'] = zuts
 
-    return A
\ No newline at end of file
+    return A
+
+# Read a comma separated text file of numbers (a single row or column is returned as a 1D array, like np.genfromtxt)
+# The text is parsed with the C parser of np.loadtxt (same values as np.genfromtxt, several times faster)
+# Files with missing values are parsed with np.genfromtxt (missing values -> NaN)
+# cache=True -> the array is stored next to the file in a hidden .npy sidecar named after the size and modification time of the file
+# The sidecar is memory-mapped when the file is read again unchanged (a modified file gets a new sidecar, the old one is removed)
+# (Copy-on-write memory map: the array is writable like a parsed one, changes are not written to the sidecar)
+def read_txt(file, cache=True):
+
+    stat = os.stat(file)
+    folder, name = os.path.split(os.path.abspath(file))
+    sidecar = os.path.join(folder, '.%s.%i-%i.npy' % (name, stat.st_size, stat.st_mtime_ns))
+
+    if cache and os.path.exists(sidecar):
+        try:
+            return np.load(sidecar, mmap_mode='c')
+        except (OSError, ValueError):
+            pass
+
+    try:
+        a = np.loadtxt(file, delimiter=',', ndmin=2)
+    except ValueError:
+        a = np.genfromtxt(file, delimiter=',', ndmin=2)
+
+    if 1 in a.shape:
+        a = a.reshape(-1)
+
+    if cache:
+        try:
+            # Remove the sidecars of previous versions of the file
+            for old in glob.glob(os.path.join(glob.escape(folder), glob.escape('.'+name)+'.*-*.npy')):
+                os.remove(old)
+
+            # Write the sidecar atomically (other processes may read it at the same time)
+            tmp = sidecar+'.%i.tmp' % (os.getpid())
+            with open(tmp, 'wb') as f:
+                np.save(f, a)
+            os.replace(tmp, sidecar)
+
+        # Read-only folder -> no sidecar
+        except OSError:
+            pass
+
+    return a
@@ -0,0 +1,133 @@
+# AxisIndexItem for numpy
+# Map coordinates of a 1D axis into the indexes of the closest axis elements
+
+import numpy as np
+
+class AxisIndexItem:
+
+    def __init__(self, axis, rtol=1e-2):
+
+        # Store the axis
+        self.axis = np.asarray(axis)
+        self.size = len(self.axis)
+
+        # Descending axes are mapped using their reversed (ascending) view
+        self.descending = bool(self.size > 1 and self.axis[-1] < self.axis[0])
+        if self.descending:
+            self.asc = self.axis[::-1]
+        else:
+            self.asc = self.axis
+
+        # Steps of the ascending view (computed once for the monotonicity and uniformity checks)
+        steps = np.diff(self.asc)
+
+        # Check if the axis is monotonic
+        # Non-monotonic axes (for example unsorted exports) are mapped with a linear search of the closest element
+        self.monotonic = bool(np.all(steps >= 0))
+        if not self.monotonic:
+            self.descending = False
+            self.asc = self.axis
+
+        # Direction of increasing coordinates in index units (+1 ascending, -1 descending)
+        self.sign = -1 if self.descending else 1
+
+        # Axis limits
+        if self.monotonic:
+            self.min = float(self.asc[0])
+            self.max = float(self.asc[-1])
+        else:
+            self.min = float(np.min(self.axis))
+            self.max = float(np.max(self.axis))
+
+        # Edges of the displayed pixels (in the axis order): half a step before the first element and half a step after the last one
+        # The pixel of every element is then centered on its coordinate
+        if self.size > 1:
+            self.start = float(self.axis[0]-(self.axis[1]-self.axis[0])/2)
+            self.stop = float(self.axis[-1]+(self.axis[-1]-self.axis[-2])/2)
+        else:
+            self.start = float(self.axis[0])-0.5
+            self.stop = float(self.axis[0])+0.5
+
+        # Average step (always positive)
+        if self.size > 1:
+            self.delta = (self.max-self.min)/(self.size-1)
+        else:
+            self.delta = 0
+
+        # Check if the axis is a uniform grid (all elements within rtol steps of the linear grid min..max)
+        # The tolerance is a fraction of a pixel (a smaller drift is not visible), and at least the precision of the axis data type
+        # (Axes stored in float32 or rounded in a text export are uniform)
+        # Uniform axes are mapped with O(1) arithmetic
+        # Non-uniform axes are mapped with a binary search over the midpoints between elements
+        self.uniform = self.monotonic and self.size < 3
+        if self.monotonic and not self.uniform:
+            eps = np.finfo(self.asc.dtype).eps if np.issubdtype(self.asc.dtype, np.inexact) else 0
+            tol = max(rtol*self.delta, 4*eps*max(abs(self.min), abs(self.max)))
+            drift = np.abs(self.asc-(self.min+np.arange(self.size)*self.delta)).max()
+            self.uniform = bool(drift <= tol)
+        if not self.uniform and self.monotonic:
+            self.mids = (self.asc[1:]+self.asc[:-1])/2
+
+    # Index of the axis element closest to value
+    # value can be a number (returns an int) or an array of any shape (returns an array of ints)
+    def index(self, value):
+
+        # Single values (Python arithmetic is faster than numpy for scalars)
+        if np.ndim(value) == 0:
+
+            if self.uniform:
+                if self.delta:
+                    i = int(round((value-self.min)/self.delta))
+                    i = min(max(i, 0), self.size-1)
+                else:
+                    i = 0
+            elif self.monotonic:
+                i = int(np.searchsorted(self.mids, value))
+            else:
+                i = int(np.argmin(np.abs(self.axis-value)))
+
+        # Arrays of values
+        else:
+
+            value = np.asarray(value, dtype=float)
+
+            if self.uniform:
+                if self.delta:
+                    i = np.clip(np.rint((value-self.min)/self.delta), 0, self.size-1).astype(np.intp)
+                else:
+                    i = np.zeros(value.shape, dtype=np.intp)
+            elif self.monotonic:
+                i = np.searchsorted(self.mids, value)
+            else:
+                i = np.argmin(np.abs(self.axis-value[..., None]), axis=-1)
+
+        # Map ascending indexes to the indexes of a descending axis
+        if self.descending:
+            i = self.size-1-i
+
+        return i
+
+    # Indexes of the axis elements shown by the pixels of a uniform display grid (None for uniform axes, which are displayed as they are)
+    # The grid spans the displayed pixels edges start..stop (reverse=True -> stop..start)
+    # Every pixel shows the element closest to its center, the drawn elements are then misplaced by half a pixel at most
+    # The grid has maxratio pixels per element (but not more than maxsize pixels, unless the axis itself is longer)
+    def grid(self, reverse=False, maxratio=4, maxsize=4096):
+
+        if self.uniform:
+            return None
+
+        m = max(min(maxratio*self.size, maxsize), self.size)
+
+        a, b = self.start, self.stop
+        if reverse:
+            a, b = b, a
+
+        return self.index(a+(np.arange(m)+0.5)*(b-a)/m)
+
+    # Coordinate of the axis element next to the one closest to value
+    # d = +1 -> towards increasing coordinates
+    # d = -1 -> towards decreasing coordinates
+    # (The axis ends are never crossed)
+    def next(self, value, d):
+        i = min(max(self.index(value)+d*self.sign, 0), self.size-1)
+        return self.axis[i]
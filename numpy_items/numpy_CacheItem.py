@@ -0,0 +1,107 @@
+# CacheItem for numpy
+# Least recently used (LRU) cache bounded by the memory of the stored numpy arrays
+# (The cache can be used from several threads)
+
+from collections import OrderedDict
+import threading
+import numpy as np
+
+class CacheItem:
+
+    def __init__(self, maxbytes):
+
+        # Maximum memory of the stored arrays (bytes)
+        self.maxbytes = maxbytes
+
+        # Stored items (key -> (value, bytes)) from least to most recently used
+        self.items = OrderedDict()
+
+        # Current memory of the stored arrays (bytes)
+        self.nbytes = 0
+
+        # Lock of the stored items
+        self.lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.items
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
+
+    # Retrieve an item (it becomes the most recently used)
+    def get(self, key, default=None):
+
+        with self.lock:
+
+            if key not in self.items:
+                return default
+
+            self.items.move_to_end(key)
+            return self.items[key][0]
+
+    # Store an item (it becomes the most recently used)
+    # The least recently used items are dropped until the memory limit is respected
+    # (The new item is always kept, even if it exceeds the limit on its own)
+    # (The stored items are measured again, items like PrefixSumItem allocate memory after they are stored)
+    def put(self, key, value):
+
+        with self.lock:
+
+            self.pop(key)
+
+            self.items[key] = (value, 0)
+            self.measure()
+
+            while self.nbytes > self.maxbytes and len(self.items) > 1:
+                _, (_, m) = self.items.popitem(last=False)
+                self.nbytes -= m
+
+    # Measure the memory of the stored items
+    def measure(self):
+
+        with self.lock:
+
+            for key, (value, n) in list(self.items.items()):
+                self.items[key] = (value, self.sizeof(value))
+
+            self.nbytes = sum(n for value, n in self.items.values())
+
+    # Remove an item
+    def pop(self, key, default=None):
+
+        with self.lock:
+
+            if key not in self.items:
+                return default
+
+            value, n = self.items.pop(key)
+            self.nbytes -= n
+            return value
+
+    # Remove all items
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.nbytes = 0
+
+    # Memory of the numpy arrays in value (dictionaries, lists and tuples are inspected)
+    # Views are not counted, their memory belongs to the array they were taken from
+    # (Other objects with a nbytes attribute, like DataArrays, are counted with it)
+    @staticmethod
+    def sizeof(value):
+
+        if isinstance(value, np.ndarray):
+            return value.nbytes if value.flags.owndata else 0
+
+        if hasattr(value, 'nbytes'):
+            return int(value.nbytes)
+
+        if isinstance(value, dict):
+            return sum(CacheItem.sizeof(v) for v in value.values())
+
+        if isinstance(value, (list, tuple)):
+            return sum(CacheItem.sizeof(v) for v in value)
+
+        return 0
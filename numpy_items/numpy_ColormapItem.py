@@ -0,0 +1,68 @@
+# ColormapItem for numpy
+# Colormap lookup tables (uint8 RGBA) for pyqtgraph ImageItems
+# The tables are read from a precomputed file (numpy_Colormaps.npz), such that matplotlib is not needed at startup
+# Colormaps that are not in the file are taken from matplotlib (imported only when needed)
+
+import os
+import numpy as np
+
+# Precomputed lookup tables
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'numpy_Colormaps.npz')
+
+class ColormapItem:
+
+    def __init__(self, path=PATH):
+
+        self.path = path
+
+        # Lookup tables (name -> array), loaded on first use
+        self.luts = None
+
+    # Lookup table of a colormap
+    # inverted=True -> the colormap is reversed
+    def get(self, name, inverted=False):
+
+        # Load the precomputed lookup tables
+        if self.luts is None:
+            self.luts = {}
+            if os.path.exists(self.path):
+                with np.load(self.path) as f:
+                    for key in f.files:
+                        self.luts[key] = f[key]
+
+        # Colormaps that are not precomputed
+        if name not in self.luts:
+            self.luts[name] = mpl_lut(name)
+
+        lut = self.luts[name]
+
+        # Reversed view of the lookup table
+        if inverted:
+            return lut[::-1]
+
+        return lut
+
+# Build the lookup table of a matplotlib colormap
+def mpl_lut(name):
+
+    from matplotlib import colormaps
+
+    # Get the colormap from matplotlib
+    colormap = colormaps[name]
+    colormap._init()
+
+    # Convert the matplotlib colormap from 0-1 to 0-255 for PyQt5
+    # Ignore the last 3 rows of the colormap._lut:
+    # colormap._lut has shape (N+3,4) where the first N rows are the RGBA color representations
+    # The last 3 rows deal with the treatment of out-of-range and masked values
+    # They need to be ignored to avoid the generation of artifacts possibly related to floating-point errors
+    # (The values are rounded to the nearest integer, as matplotlib does for its 8-bit colors)
+    return np.rint(colormap._lut[1:-3]*255).astype(np.uint8)
+
+# Precompute the lookup tables of a list of matplotlib colormaps
+# (Run this file to update numpy_Colormaps.npz with the colormaps in the Display Panel menu)
+def build(names, path=PATH):
+    np.savez_compressed(path, **{name: mpl_lut(name) for name in names})
+
+if __name__ == "__main__":
+    build(["Greys","Blues","bone","spring","summer","autumn","winter","cool","jet","ocean"])
@@ -0,0 +1,273 @@
+# H5ArrayItem for numpy
+# Read-only array backed by an HDF5 dataset, read from disk only when it is indexed
+# Indexing the leading dimensions (for example a frame of a map) reads only that part of the file
+# Contiguous uncompressed datasets are memory-mapped, chunked datasets are read through a chunk cache sized to one frame
+# A region of the dataset can be selected and binned (select), only that region is then read
+# (Used as the data of a DataArray: xarray keeps it as it is and DataArray.data[...] returns numpy arrays)
+
+import operator
+import numpy as np
+
+# Maximum memory of the chunk cache of a dataset (bytes)
+MAXCACHE = 512*1024**2
+
+# Memory read at once when the whole array of a contiguous dataset is read (bytes)
+# (Chunked datasets are read one chunk size at a time)
+BLOCK = 64*1024**2
+
+class H5ArrayItem:
+
+    def __init__(self, path, name, maxcache=MAXCACHE):
+
+        import h5py
+
+        self.path = path
+        self.name = name
+        self.maxcache = maxcache
+
+        # Open the file and the dataset (read only)
+        self.file = h5py.File(path, 'r')
+        dataset = self.file[name]
+
+        shape = dataset.shape
+        self.chunks = dataset.chunks
+        self.h5dtype = dataset.dtype
+
+        # Memory held by the array (bytes)
+        # (Not the size of the dataset: the data stays on disk, only the chunk cache is kept in memory)
+        self.nbytes = 0
+
+        # Contiguous uncompressed dataset -> memory map of the file
+        offset = dataset.id.get_offset() if self.chunks is None else None
+        if offset is not None and dataset.compression is None:
+            self.dataset = np.memmap(path, dtype=self.h5dtype, mode='r', offset=offset, shape=shape)
+
+        # Chunked dataset -> reopen it with a chunk cache holding all the chunks of a frame (the last two dimensions)
+        # The neighbouring frames stored in the same chunks are then read without decompressing them again
+        elif self.chunks is not None:
+            nchunks = int(np.prod([-(-n//c) for n, c in zip(shape[-2:], self.chunks[-2:])]))
+            nbytes = min(nchunks*int(np.prod(self.chunks))*self.h5dtype.itemsize, maxcache)
+            dapl = h5py.h5p.create(h5py.h5p.DATASET_ACCESS)
+            dapl.set_chunk_cache(slots(nchunks), nbytes, 1.0)
+            self.dataset = h5py.Dataset(h5py.h5d.open(self.file.id, name.encode(), dapl=dapl))
+            self.nbytes = nbytes
+
+        else:
+            self.dataset = dataset
+
+        # Region of the dataset: (start, bin, size, kept) for each dimension of the dataset
+        # start -> first index in the dataset, bin -> dataset indexes averaged in one index, size -> number of indexes
+        # kept=False -> the dimension was removed by an integer index
+        self.region = [(0, 1, n, True) for n in shape]
+        self.update()
+
+    # Shape and data type of the selected region
+    def update(self):
+
+        self.shape = tuple(n for start, b, n, kept in self.region if kept)
+        self.ndim = len(self.shape)
+        self.size = int(np.prod(self.shape))
+
+        # Binned integer data is averaged in float32 (float data keeps its precision)
+        if any(b > 1 for start, b, n, kept in self.region) and not np.issubdtype(self.h5dtype, np.floating):
+            self.dtype = np.dtype(np.float32)
+        else:
+            self.dtype = self.h5dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return 'H5ArrayItem(%r, %r, shape=%s, dtype=%s)' % (self.path, self.name, self.shape, self.dtype)
+
+    # Select a region (the file is not read, the new array shares the dataset and its chunk cache)
+    # key -> basic index of the current dimensions (integers remove a dimension, slices must have step 1)
+    # bins -> number of indexes averaged together along each remaining dimension (the last incomplete bin is dropped)
+    def select(self, key=(), bins=None):
+
+        key = expand(key, self.ndim)
+
+        region = []
+        j = 0
+        for start, b, n, kept in self.region:
+
+            if not kept:
+                region.append((start, b, n, kept))
+                continue
+
+            k = key[j]
+            j += 1
+
+            if isinstance(k, slice):
+                i0, i1, step = k.indices(n)
+                if step != 1:
+                    raise IndexError('Only slices with step 1 can be selected')
+                region.append((start+i0*b, b, max(i1-i0, 0), True))
+            else:
+                region.append((start+index(k, n)*b, b, 1, False))
+
+        # Bin the remaining dimensions
+        if bins is not None:
+            bins = iter(bins)
+            for i, (start, b, n, kept) in enumerate(region):
+                if kept:
+                    m = int(next(bins))
+                    region[i] = (start, b*m, n//m, kept)
+
+        item = H5ArrayItem.__new__(H5ArrayItem)
+        item.__dict__.update(self.__dict__)
+        item.region = region
+        item.update()
+
+        return item
+
+    # Pickling (for example to send the array to another process): the file is reopened with the same region
+    def __getstate__(self):
+        return {'path': self.path, 'name': self.name, 'maxcache': self.maxcache, 'region': self.region}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['name'], state['maxcache'])
+        self.region = state['region']
+        self.update()
+
+    # Read part of the array (basic indexing, as numpy)
+    def __getitem__(self, key):
+
+        key = expand(key, self.ndim)
+
+        source = []   # Index of the dataset
+        shape = []    # Shape of the binned read (index count, bin) for each dimension that is read as a slice
+        axes = []     # Axes of shape averaged by the binning
+        post = []     # Index of the binned read (only needed for slices with step different from 1)
+        empty = False
+
+        j = 0
+        for start, b, n, kept in self.region:
+
+            if kept:
+                k = key[j]
+                j += 1
+            else:
+                k = 0
+
+            if isinstance(k, slice):
+                r = range(*k.indices(n))
+                if len(r) == 0:
+                    empty = True
+                    continue
+                i0, i1 = min(r), max(r)+1
+                stop = r.stop-i0
+                post.append(slice(r.start-i0, stop if stop >= 0 else None, r.step))
+                source.append(slice(start+i0*b, start+i1*b))
+                axes.append(len(shape)+1)
+                shape += [i1-i0, b]
+
+            # Integer index without binning -> read by the dataset (the dimension is removed)
+            elif b == 1:
+                source.append(start+index(k, n))
+
+            # Integer index with binning -> read the bin and average it (the dimension is removed)
+            else:
+                i = index(k, n)
+                source.append(slice(start+i*b, start+(i+1)*b))
+                axes += [len(shape), len(shape)+1]
+                shape += [1, b]
+
+        # Empty selection -> nothing to read
+        if empty:
+            return np.empty(tuple(len(range(*k.indices(n))) for k, n in zip(key, self.shape) if isinstance(k, slice)), self.dtype)
+
+        a = np.asarray(self.dataset[tuple(source)])
+
+        if any(b > 1 for start, b, n, kept in self.region):
+            a = a.reshape(shape).mean(axis=tuple(axes), dtype=self.dtype)
+
+        if any(p.step != 1 for p in post):
+            a = a[tuple(post)]
+
+        return a
+
+    # Read the whole array (numpy conversion)
+    # The array is read along its first dimension in blocks, such that the memory used by the binning is bounded by one block
+    def __array__(self, dtype=None, copy=None):
+
+        if self.ndim == 0:
+            a = self[()]
+
+        else:
+            a = np.empty(self.shape, self.dtype)
+            limit = int(np.prod(self.chunks))*self.h5dtype.itemsize if self.chunks else BLOCK
+            rowbytes = self.h5dtype.itemsize*int(np.prod([n*b for start, b, n, kept in self.region]))//max(self.shape[0], 1)
+            step = max(1, limit//max(rowbytes, 1))
+            for i in range(0, self.shape[0], step):
+                a[i:i+step] = self[i:i+step]
+
+        if dtype is not None:
+            a = a.astype(dtype, copy=False)
+
+        return a
+
+    # numpy functions and ufuncs read the whole array
+    # (Their presence also makes xarray keep this object as the data of a DataArray instead of converting it)
+    def __array_function__(self, func, types, args, kwargs):
+        return func(*read(args), **read(kwargs))
+
+    def __array_ufunc__(self, ufunc, method, *args, **kwargs):
+        return getattr(ufunc, method)(*read(args), **read(kwargs))
+
+    # Data type conversion (reads the whole array)
+    def astype(self, dtype, **kwargs):
+        return np.asarray(self).astype(dtype, **kwargs)
+
+# Replace the H5ArrayItems in the arguments of a numpy function by their data
+def read(value):
+
+    if isinstance(value, H5ArrayItem):
+        return np.asarray(value)
+
+    if isinstance(value, dict):
+        return {k: read(v) for k, v in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return type(value)(read(v) for v in value)
+
+    return value
+
+# Basic index of ndim dimensions (tuple of integers and slices)
+def expand(key, ndim):
+
+    if not isinstance(key, tuple):
+        key = (key,)
+
+    if any(k is Ellipsis for k in key):
+        i = key.index(Ellipsis)
+        key = key[:i]+(slice(None),)*(ndim-len(key)+1)+key[i+1:]
+
+    if len(key) > ndim:
+        raise IndexError('Too many indices for an array of %i dimensions' % (ndim))
+
+    for k in key:
+        if not isinstance(k, slice):
+            operator.index(k)
+
+    return key+(slice(None),)*(ndim-len(key))
+
+# Positive integer index of a dimension of size n
+def index(k, n):
+
+    i = operator.index(k)
+    if i < 0:
+        i += n
+    if not 0 <= i < n:
+        raise IndexError('Index %i is out of bounds for a dimension of size %i' % (k, n))
+
+    return i
+
+# Number of slots of a chunk cache: a prime number about 100 times the number of cached chunks (HDF5 recommendation)
+def slots(nchunks):
+
+    n = max(100*nchunks, 521) | 1
+    while any(n % d == 0 for d in range(3, int(n**0.5)+1, 2)):
+        n += 2
+
+    return n
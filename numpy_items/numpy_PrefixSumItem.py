@@ -0,0 +1,72 @@
+# PrefixSumItem for numpy
+# Prefix sums of a 2D array along one axis, such that the average over any span of indexes costs one row difference
+# The prefix sums are computed the first time an average is requested (data that is never integrated does not hold them)
+
+import numpy as np
+
+class PrefixSumItem:
+
+    def __init__(self, z, axis, dtype, valid=None):
+
+        # Array and summed axis (0 -> sums over the rows, 1 -> sums over the columns)
+        self.z = z
+        self.axis = axis
+
+        # Data type of the sums
+        # Integer sums may wrap around, but their differences are exact as long as the sum of a whole row or column fits in the data type
+        self.dtype = np.dtype(dtype)
+
+        # Mask of the non-NaN values (None if the array has no NaN values)
+        # NaN values are summed as zeros and the non-NaN counts are also summed, such that only the non-NaN values are averaged
+        self.valid = valid
+
+        # Prefix sums (and counts) with a leading row of zeros: the sum over the indexes a..b is sums[b+1]-sums[a]
+        # (The summed axis is the first axis of sums, such that its rows are contiguous in memory)
+        self.sums = None
+        self.counts = None
+
+        # Length of the averages
+        self.size = z.shape[1-axis]
+
+    # Memory held by the prefix sums (bytes, 0 until they are computed)
+    # (The array itself is not counted, it belongs to the prepared data)
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.sums, self.counts) if a is not None)
+
+    # Compute the prefix sums
+    def build(self):
+
+        z = self.z if self.axis == 0 else self.z.T
+        n = z.shape[0]
+
+        if self.valid is not None:
+            valid = self.valid if self.axis == 0 else self.valid.T
+            z = np.where(valid, z, 0)
+            self.counts = np.zeros((n+1, self.size), dtype=np.int32)
+            np.cumsum(valid, axis=0, dtype=np.int32, out=self.counts[1:])
+
+        self.sums = np.zeros((n+1, self.size), dtype=self.dtype)
+        np.cumsum(z, axis=0, dtype=self.dtype, out=self.sums[1:])
+
+    # Average over the indexes a..b (both included) of the summed axis
+    # If out is provided the result is written into it (no new array is allocated)
+    # NaN values are ignored (the average is NaN where all the values are NaN)
+    # (The difference is computed in the data type of the sums, such that the wrapped integer sums give exact differences)
+    def mean(self, a, b, out=None):
+
+        if self.sums is None:
+            self.build()
+
+        if out is None:
+            out = np.empty(self.size)
+
+        out = np.subtract(self.sums[b+1], self.sums[a], out=out, dtype=self.dtype)
+
+        if self.counts is None:
+            out /= (b-a+1)
+        else:
+            with np.errstate(invalid='ignore'):
+                out /= self.counts[b+1]-self.counts[a]
+
+        return out
@@ -0,0 +1,50 @@
+# PyramidItem for numpy
+# Multi-resolution (mipmap) pyramid of a 2D array for fast display of large images
+
+import numpy as np
+
+class PyramidItem:
+
+    def __init__(self, a, minsize=512):
+
+        # Level 0 is the array itself
+        # Every next level is the 2x2 mean of the previous one, until its largest side is not larger than minsize
+        # (For odd sizes the last row/column of the previous level is dropped)
+        self.levels = [a]
+
+        # Integer data is averaged in float32 (float data keeps its precision)
+        if np.issubdtype(a.dtype, np.floating):
+            dtype = a.dtype
+        else:
+            dtype = np.float32
+
+        while max(a.shape) > minsize and min(a.shape) > 1:
+            h, w = a.shape[0]//2, a.shape[1]//2
+            a = a[:2*h,:2*w].reshape(h, 2, w, 2).mean(axis=(1,3), dtype=dtype)
+            self.levels.append(a)
+
+        # Original shape
+        self.shape = self.levels[0].shape
+
+    # Memory held by the pyramid (bytes)
+    # (Level 0 is not counted, it belongs to the displayed array)
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.levels[1:])
+
+    # Number of levels
+    def __len__(self):
+        return len(self.levels)
+
+    # Fraction of the original array covered by a level along each axis
+    # (Smaller than 1 if rows/columns were dropped for odd sizes)
+    def scale(self, k):
+        s = 2**k
+        return (self.levels[k].shape[0]*s/self.shape[0], self.levels[k].shape[1]*s/self.shape[1])
+
+    # Coarsest level whose pixels are not larger than ratio original pixels
+    # ratio -> number of original pixels per screen pixel (the smallest of both axes)
+    def level(self, ratio):
+        if ratio < 2:
+            return 0
+        return min(int(np.log2(ratio)), len(self.levels)-1)
@@ -0,0 +1,58 @@
+# StatsItem for numpy
+# Statistics of a data array computed once when a file is prepared: minimum, maximum, NaN mask and count, and percentile table
+# NaN values are ignored (a few NaNs do not break the contrast levels or the side plot ranges)
+
+import numpy as np
+
+class StatsItem:
+
+    def __init__(self, z, q=np.arange(101), maxsample=2**18):
+
+        self.size = z.size
+
+        # NaN values (only float data can have them)
+        # valid -> mask of the non-NaN values (None if there are no NaN values), also used by the NaN-aware integration
+        self.valid = None
+        self.nnan = 0
+        if np.issubdtype(z.dtype, np.inexact):
+            nan = np.isnan(z)
+            self.nnan = int(np.count_nonzero(nan))
+            if self.nnan:
+                self.valid = np.logical_not(nan, out=nan)
+
+        # Minimum and maximum (fmin and fmax ignore the NaN values without copying the data)
+        # (Returned as floats, like the percentile table)
+        # (All-NaN or empty data -> zeros)
+        if self.nnan == self.size:
+            self.min = self.max = 0
+        elif self.nnan:
+            self.min = float(np.fmin.reduce(z, axis=None))
+            self.max = float(np.fmax.reduce(z, axis=None))
+        else:
+            self.min = float(z.min())
+            self.max = float(z.max())
+
+        # Percentile table of the contrast sliders
+        # Large arrays -> percentiles of a random sample of maxsample values (the contrast sliders have a resolution of 1%, much coarser than the sampling error)
+        # The first and last elements are the exact minimum and maximum
+        if self.nnan == self.size:
+            self.q = np.zeros(len(q))
+        else:
+            if self.size > maxsample:
+                i = np.sort(np.random.default_rng(0).integers(0, self.size, maxsample))
+                if z.flags.c_contiguous:
+                    values = z.reshape(-1)[i]
+                else:
+                    values = z[np.unravel_index(i, z.shape)]
+            else:
+                values = z
+            if self.nnan:
+                values = values[~np.isnan(values)]
+            self.q = np.percentile(values, q) if values.size else np.zeros(len(q))
+            self.q[0] = self.min
+            self.q[-1] = self.max
+
+    # Memory held by the statistics (bytes): the NaN mask
+    @property
+    def nbytes(self):
+        return self.valid.nbytes if self.valid is not None else 0
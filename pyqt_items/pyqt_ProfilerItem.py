@@ -0,0 +1,114 @@
+# ProfilerItem for PyQt5
+# Record the time spent in slots and the rate of signal events, and show them periodically
+
+import time
+import json
+import inspect
+from PyQt5 import QtCore
+
+class ProfilerItem:
+
+    def __init__(self, period=1000):
+
+        # Slot timings (name -> [calls, total time (s), maximum time (s)])
+        self.slots = {}
+
+        # Slot timings since the last report (name -> total time (s))
+        self.recent = {}
+
+        # Signal events (name -> total count) and events since the last report (name -> count)
+        self.events = {}
+        self.recentevents = {}
+
+        # Start time and time of the last report
+        self.t0 = time.perf_counter()
+        self.tlast = self.t0
+
+        # Function receiving the periodic report text (for example QStatusBar.showMessage)
+        self.display = None
+
+        # Timer of the periodic report
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.report)
+        self.timer.start(period)
+
+    # Set the function receiving the periodic report text
+    def setDisplay(self, display):
+        self.display = display
+
+    # Wrap a slot, such that the time spent in it is recorded under name
+    # The arguments of the signal are truncated to the number accepted by the slot (as PyQt5 does for direct connections)
+    def wrap(self, name, func):
+
+        n = None
+        try:
+            params = inspect.signature(func).parameters.values()
+            if not any(p.kind == p.VAR_POSITIONAL for p in params):
+                n = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params)
+        except (TypeError, ValueError):
+            pass
+
+        def wrapper(*args):
+            t = time.perf_counter()
+            try:
+                return func(*args[:n]) if n is not None else func(*args)
+            finally:
+                self.record(name, time.perf_counter()-t)
+
+        return wrapper
+
+    # Record the time of a call of a slot
+    def record(self, name, dt):
+
+        s = self.slots.get(name)
+        if s is None:
+            s = self.slots[name] = [0, 0.0, 0.0]
+
+        s[0] += 1
+        s[1] += dt
+        s[2] = max(s[2], dt)
+
+        self.recent[name] = self.recent.get(name, 0.0)+dt
+
+    # Slot counting the events of a signal under name
+    def counter(self, name):
+
+        def count(*args):
+            self.events[name] = self.events.get(name, 0)+1
+            self.recentevents[name] = self.recentevents.get(name, 0)+1
+
+        return count
+
+    # Periodic report: signal events per second and the slots with most time since the last report
+    def report(self):
+
+        t = time.perf_counter()
+        dt = max(t-self.tlast, 1e-9)
+        self.tlast = t
+
+        text = ' '.join('%s=%.0f/s' % (name, count/dt) for name, count in sorted(self.recentevents.items()))
+        top = sorted(self.recent.items(), key=lambda item: -item[1])[:3]
+        if top:
+            text += ' | '+' '.join('%s=%.0f%%' % (name, 100*total/dt) for name, total in top)
+
+        self.recent = {}
+        self.recentevents = {}
+
+        if self.display and text:
+            self.display(text)
+
+    # Summary of the whole session
+    def summary(self):
+
+        t = time.perf_counter()-self.t0
+
+        return {
+            'duration_s': t,
+            'slots': {name: {'calls': s[0], 'total_ms': 1000*s[1], 'mean_ms': 1000*s[1]/s[0], 'max_ms': 1000*s[2]} for name, s in sorted(self.slots.items(), key=lambda item: -item[1][1])},
+            'events': {name: {'count': count, 'rate_per_s': count/t} for name, count in sorted(self.events.items())},
+        }
+
+    # Write the summary of the whole session to a JSON file
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
@@ -0,0 +1,81 @@
+# ScheduleItem for PyQt5
+# Coalesce updates requested by fast signals and run them at most once per frame
+
+from PyQt5 import QtCore
+
+class ScheduleItem:
+
+    def __init__(self, fps):
+
+        # Pending updates (key -> function) in the order they were requested
+        # Requesting an update that is already pending does not duplicate it
+        self.pending = {}
+
+        # Functions run before and after the pending updates in every flush
+        self.preflush = None
+        self.postflush = None
+
+        # Single-shot timer that triggers the flush
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+        # Time since the last flush
+        self.clock = QtCore.QElapsedTimer()
+        self.clock.start()
+
+        # Set the maximum number of flushes per second
+        self.setMaxFPS(fps)
+
+    # Set the maximum number of flushes per second
+    # (If fps is None or 0 the updates are run immediately when requested)
+    def setMaxFPS(self, fps):
+        self.fps = fps
+        if fps:
+            self.period = 1000/fps # Minimum time between flushes (ms)
+        else:
+            self.period = 0
+
+    # Set the functions run before and after the pending updates in every flush
+    def setFlushHooks(self, preflush, postflush):
+        self.preflush = preflush
+        self.postflush = postflush
+
+    # Request an update
+    def schedule(self, key, func):
+
+        self.pending[key] = func
+
+        # Run the update immediately if there is no frame rate limit
+        if not self.period:
+            self.flush()
+
+        # Otherwise wait until the next frame (if the timer is not already waiting)
+        elif not self.timer.isActive():
+            self.timer.start(max(0, int(self.period - self.clock.elapsed())))
+
+    # Drop all pending updates
+    def clear(self):
+        self.timer.stop()
+        self.pending = {}
+
+    # Run all pending updates
+    def flush(self):
+
+        self.timer.stop()
+        self.clock.restart()
+
+        # Take the pending updates (updates requested during the flush wait for the next one)
+        pending = self.pending
+        self.pending = {}
+
+        if pending:
+
+            if self.preflush:
+                self.preflush()
+
+            for func in pending.values():
+                func()
+
+            if self.postflush:
+                self.postflush()
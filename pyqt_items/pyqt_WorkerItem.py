@@ -0,0 +1,62 @@
+# WorkerItem for PyQt5
+# Run a function in a QThreadPool and deliver its result in the GUI thread
+
+import threading
+from PyQt5 import QtCore
+
+# Signals of WorkerItem (QRunnable is not a QObject and cannot define signals)
+# The object is created in the GUI thread, so the connected slots are run in the GUI thread
+class WorkerSignals(QtCore.QObject):
+
+    # Emitted with the worker when it is done
+    finished = QtCore.pyqtSignal(object)
+
+class WorkerItem(QtCore.QRunnable):
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+
+        # The worker is owned by Python, not by the QThreadPool
+        self.setAutoDelete(False)
+
+        # Function to run
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+        # Result of the function (or the exception it raised)
+        self.result = None
+        self.error = None
+
+        # Set when the worker is done (see wait)
+        self.done = threading.Event()
+
+        # A cancelled worker does not run the function if it did not start yet
+        # (If it is already running its result is still delivered, the receiver decides what to do with it)
+        self.cancelled = False
+
+        self.signals = WorkerSignals()
+
+    def run(self):
+
+        if not self.cancelled:
+            try:
+                self.result = self.func(*self.args, **self.kwargs)
+            except Exception as e:
+                self.error = e
+
+        self.done.set()
+
+        # The signals are deleted if the application quit while the function was running (nobody receives the result)
+        try:
+            self.signals.finished.emit(self)
+        except RuntimeError:
+            pass
+
+    # Cancel the worker
+    def cancel(self):
+        self.cancelled = True
+
+    # Block until the worker is done
+    def wait(self):
+        self.done.wait()